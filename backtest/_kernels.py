@@ -0,0 +1,333 @@
+"""
+Compiled Kernels - Numba-accelerated backtest inner loops
+
+The per-tick simulation is plain scalar float work over a few arrays,
+so it is compiled with Numba instead of running through the CPython
+interpreter. Kernels take NumPy arrays and return NumPy arrays; turning
+the results into Trade objects is left to the engine. They release the
+GIL, so threaded callers can run markets concurrently.
+
+Encodings shared with the engine:
+    side:      0 = up, 1 = down
+    exit_type: 0 = market_end, 1 = take_profit, 2 = stop_loss
+    exit_idx:  tick index of the exit, or len(ts) for a market_end exit
+
+Without Numba installed the same functions run as plain Python: results
+are identical, only much slower.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+try:
+    from numba import float64, int64, njit, prange
+    from numba.experimental import jitclass
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    class _AnyType:
+        """Stand-in for Numba type objects in jitclass specs (float64[:, :])."""
+
+        def __getitem__(self, _):
+            return self
+
+    float64 = int64 = _AnyType()
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    def jitclass(spec):
+        return lambda cls: cls
+
+
+SIDE_UP = 0
+SIDE_DOWN = 1
+
+EXIT_MARKET_END = 0
+EXIT_TAKE_PROFIT = 1
+EXIT_STOP_LOSS = 2
+
+# Same history depth as the live PriceTracker (max_history=100)
+HISTORY_SIZE = 100
+
+
+class OpenPosition(NamedTuple):
+    """Position held inside the market kernel (a register-only record under Numba)."""
+
+    side: int  # SIDE_UP / SIDE_DOWN, or -1 when flat
+    entry_idx: int
+    entry_price: float
+
+
+NO_POSITION = OpenPosition(-1, 0, 0.0)
+
+
+@jitclass([
+    ("lookback", float64),
+    ("drop_threshold", float64),
+    ("hist_t", float64[:, :]),
+    ("hist_p", float64[:, :]),
+    ("head", int64[:]),
+    ("count", int64[:]),
+])
+class FastTracker:
+    """
+    Compiled counterpart of lib.price_tracker.PriceTracker.
+
+    Keeps a fixed-size ring buffer of (timestamp, price) per side, indexed
+    by side code instead of "up"/"down" strings, and takes the current
+    time as an argument so detection runs in market time.
+    """
+
+    def __init__(self, lookback, drop_threshold, max_history):
+        self.lookback = lookback
+        self.drop_threshold = drop_threshold
+        self.hist_t = np.empty((2, max_history), dtype=np.float64)
+        self.hist_p = np.empty((2, max_history), dtype=np.float64)
+        self.head = np.zeros(2, dtype=np.int64)
+        self.count = np.zeros(2, dtype=np.int64)
+
+    def record(self, side, price, t):
+        """Record a price point; non-positive (or NaN) prices are ignored."""
+        if not price > 0:
+            return
+        size = self.hist_t.shape[1]
+        h = self.head[side]
+        self.hist_t[side, h] = t
+        self.hist_p[side, h] = price
+        self.head[side] = (h + 1) % size
+        if self.count[side] < size:
+            self.count[side] += 1
+
+    def detect_flash_crash(self, now):
+        """
+        Check UP then DOWN for a drop of at least drop_threshold between
+        the oldest price inside the lookback window and the latest price.
+
+        Returns:
+            (side, crash_price), with side -1 if no crash was detected
+        """
+        size = self.hist_t.shape[1]
+        for s in range(2):
+            c = self.count[s]
+            if c < 2:
+                continue
+            newest = (self.head[s] - 1) % size
+            oldest = (self.head[s] - c) % size
+
+            # Oldest point still inside the lookback window
+            old_price = -1.0
+            for k in range(c):
+                j = (oldest + k) % size
+                if now - self.hist_t[s, j] <= self.lookback:
+                    old_price = self.hist_p[s, j]
+                    break
+            if old_price < 0:
+                continue
+
+            current = self.hist_p[s, newest]
+            if old_price - current >= self.drop_threshold:
+                return s, current
+        return -1, 0.0
+
+
+@njit(cache=True, nogil=True)
+def _simulate_market(ts, up, down, drop_threshold, lookback, take_profit, stop_loss,
+                     allow_reentry):
+    """
+    Simulate the flash crash strategy over one market.
+
+    Flash crashes are detected with FastTracker evaluated at the tick
+    timestamp, matching PriceTracker.detect_flash_crash.
+
+    Args:
+        ts: Tick timestamps, ascending (float64)
+        up: UP prices per tick, NaN where missing (float64)
+        down: DOWN prices per tick, NaN where missing (float64)
+        drop_threshold: Absolute probability drop that triggers entry
+        lookback: Lookback window in seconds
+        take_profit: Take profit delta above entry
+        stop_loss: Stop loss delta below entry
+        allow_reentry: Keep scanning for entries after a TP/SL exit; when
+            False the loop stops at the first exit, since no further
+            trade can open in this market
+
+    Returns:
+        (entry_idx, exit_idx, side, entry_px, exit_px, exit_type) arrays
+    """
+    n = ts.shape[0]
+
+    tracker = FastTracker(lookback, drop_threshold, HISTORY_SIZE)
+
+    # At most one trade can open per tick
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    side_out = np.empty(n, dtype=np.int8)
+    entry_px = np.empty(n, dtype=np.float64)
+    exit_px = np.empty(n, dtype=np.float64)
+    exit_type = np.empty(n, dtype=np.int8)
+    num_trades = 0
+
+    pos = NO_POSITION
+
+    for i in range(n):
+        t = ts[i]
+        up_p = up[i]
+        down_p = down[i]
+
+        # Record prices (missing sides are NaN and skipped)
+        tracker.record(SIDE_UP, up_p, t)
+        tracker.record(SIDE_DOWN, down_p, t)
+
+        # --- Check exits for open position ---
+        if pos.side >= 0:
+            current = up_p if pos.side == SIDE_UP else down_p
+            tp_price = pos.entry_price + take_profit
+            sl_price = pos.entry_price - stop_loss
+
+            # Both levels are evaluated unconditionally and combined with
+            # bitwise ops so the hot loop has no data-dependent branches.
+            # TP wins over SL; missing (NaN) or non-positive prices never exit.
+            valid = current > 0
+            hit_tp = valid & (current >= tp_price)
+            hit_sl = valid & (current <= sl_price) & (current < tp_price)
+
+            if hit_tp | hit_sl:
+                entry_idx[num_trades] = pos.entry_idx
+                exit_idx[num_trades] = i
+                side_out[num_trades] = pos.side
+                entry_px[num_trades] = pos.entry_price
+                # Assume fill at the TP/SL level
+                exit_px[num_trades] = tp_price if hit_tp else sl_price
+                exit_type[num_trades] = hit_tp * EXIT_TAKE_PROFIT + hit_sl * EXIT_STOP_LOSS
+                num_trades += 1
+                pos = NO_POSITION
+                if not allow_reentry:
+                    break
+
+        # --- Check for flash crash entry ---
+        if pos.side < 0:
+            crash_side, _ = tracker.detect_flash_crash(t)
+            if crash_side >= 0:
+                price = up_p if crash_side == SIDE_UP else down_p
+                if price > 0:
+                    pos = OpenPosition(crash_side, i, price)
+
+    # --- Market end: force-close at the last known price of the side ---
+    if pos.side >= 0:
+        prices = up if pos.side == SIDE_UP else down
+        last_price = 0.0
+        for i in range(n - 1, -1, -1):
+            if not np.isnan(prices[i]):
+                last_price = prices[i]
+                break
+        if last_price > 0:
+            entry_idx[num_trades] = pos.entry_idx
+            exit_idx[num_trades] = n
+            side_out[num_trades] = pos.side
+            entry_px[num_trades] = pos.entry_price
+            exit_px[num_trades] = last_price
+            exit_type[num_trades] = EXIT_MARKET_END
+            num_trades += 1
+
+    return (
+        entry_idx[:num_trades],
+        exit_idx[:num_trades],
+        side_out[:num_trades],
+        entry_px[:num_trades],
+        exit_px[:num_trades],
+        exit_type[:num_trades],
+    )
+
+
+@njit(cache=True, parallel=True)
+def _simulate_all(ts, up, down, offsets, drop_threshold, lookback, take_profit, stop_loss,
+                  allow_reentry):
+    """
+    Run _simulate_market for every packed market in parallel.
+
+    Market m's ticks are ts/up/down[offsets[m]:offsets[m + 1]]. Markets
+    are independent until equity aggregation, so they are spread across
+    Numba's thread pool (sized by NUMBA_NUM_THREADS). Market m's trades
+    are written to the same [offsets[m], offsets[m] + counts[m]) slice of
+    the outputs, which cannot overflow since a market has at most one
+    trade per tick. Trade indices are local to the market.
+
+    Returns:
+        (entry_idx, exit_idx, side, entry_px, exit_px, exit_type, counts)
+    """
+    total = ts.shape[0]
+    num_markets = offsets.shape[0] - 1
+
+    entry_idx = np.empty(total, dtype=np.int64)
+    exit_idx = np.empty(total, dtype=np.int64)
+    side_out = np.empty(total, dtype=np.int8)
+    entry_px = np.empty(total, dtype=np.float64)
+    exit_px = np.empty(total, dtype=np.float64)
+    exit_type = np.empty(total, dtype=np.int8)
+    counts = np.zeros(num_markets, dtype=np.int64)
+
+    for m in prange(num_markets):
+        lo = offsets[m]
+        hi = offsets[m + 1]
+        e, x, s, ep, xp, et = _simulate_market(
+            ts[lo:hi], up[lo:hi], down[lo:hi],
+            drop_threshold, lookback, take_profit, stop_loss, allow_reentry,
+        )
+        c = e.shape[0]
+        entry_idx[lo:lo + c] = e
+        exit_idx[lo:lo + c] = x
+        side_out[lo:lo + c] = s
+        entry_px[lo:lo + c] = ep
+        exit_px[lo:lo + c] = xp
+        exit_type[lo:lo + c] = et
+        counts[m] = c
+
+    return entry_idx, exit_idx, side_out, entry_px, exit_px, exit_type, counts
+
+
+@njit(cache=True, nogil=True)
+def _merge_sorted(up_ts, up_px, down_ts, down_px):
+    """
+    Merge two time-sorted price series into one timeline in O(n + m).
+
+    Both inputs must be sorted by timestamp. Equal timestamps across the
+    sides become one tick; repeated timestamps within a side keep the
+    last price. Sides without a price at a tick are NaN.
+
+    Returns:
+        (ts, up, down) float64 arrays
+    """
+    n_up = up_ts.shape[0]
+    n_down = down_ts.shape[0]
+    ts = np.empty(n_up + n_down, dtype=np.float64)
+    up = np.empty(n_up + n_down, dtype=np.float64)
+    down = np.empty(n_up + n_down, dtype=np.float64)
+
+    i = 0
+    j = 0
+    k = 0
+    while i < n_up or j < n_down:
+        if j >= n_down or (i < n_up and up_ts[i] <= down_ts[j]):
+            t = up_ts[i]
+        else:
+            t = down_ts[j]
+
+        ts[k] = t
+        up[k] = np.nan
+        down[k] = np.nan
+        while i < n_up and up_ts[i] == t:
+            up[k] = up_px[i]
+            i += 1
+        while j < n_down and down_ts[j] == t:
+            down[k] = down_px[j]
+            j += 1
+        k += 1
+
+    return ts[:k], up[:k], down[:k]
@@ -8,15 +8,38 @@ Provides two data sources for backtesting:
 Both return the same structure for interchangeability.
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import math
-import random
+import os
+import pickle
+import tempfile
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# aiohttp is only needed for live fetching and is slow to import, so it
+# is imported inside the async helpers that use it
+if TYPE_CHECKING:
+    import aiohttp
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 # ── Data structures ──────────────────────────────────────────────────────────
@@ -43,7 +66,154 @@ COIN_SLUGS = {
     "XRP": "xrp-updown-15m",
 }
 
+# Concurrency limits for the async fetch path
+MAX_CONNECTIONS = 20
+MAX_CONCURRENT_REQUESTS = 10
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session with connection pooling and retry on throttling."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry),
+    )
+    return session
+
+
+# Shared by the synchronous fetch helpers; the async path uses aiohttp
+_SESSION = _build_session()
+
+# On-disk cache for responses of markets that have already closed
+CACHE_DIR = Path.home() / ".cache" / "polymarket_backtest"
+
+# A market's history is final this long after its window ends
+FINALIZED_AFTER_SECONDS = 900
+
+
+# ── Response cache ───────────────────────────────────────────────────────────
+
+# (url, params, end_ts) identifying a request, or None to bypass the cache
+CacheKey = Optional[Tuple[str, Dict[str, Any], int]]
+
+
+def _cache_path(url: str, params: Dict[str, Any]) -> Path:
+    """Cache file for a request, keyed on URL and query parameters."""
+    key = url + json.dumps(params, sort_keys=True)
+    return CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+
+def _cacheable_path(key: CacheKey) -> Optional[Path]:
+    """Cache file for a request, or None if its market may still change."""
+    if key is None:
+        return None
+    url, params, end_ts = key
+    if end_ts >= time.time() - FINALIZED_AFTER_SECONDS:
+        return None
+    return _cache_path(url, params)
+
+
+def _cache_load(path: Optional[Path]) -> Any:
+    """Load a cached response, or None on a miss."""
+    if path is None or not path.exists():
+        return None
+    try:
+        return json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_store(path: Optional[Path], value: Any) -> None:
+    """Store a response; empty results are not cached since they may be errors."""
+    if path is None or not value:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(json_dumps(value))
+    except OSError:
+        pass
+
+
+def _disk_cached(cache_key: Callable[..., CacheKey]) -> Callable:
+    """
+    Cache a fetch function's result on disk.
+
+    Historical data never changes once a market has closed, so repeated
+    backtests over the same windows skip the network entirely. Works for
+    both sync and async functions; cache_key receives the call arguments.
+    Async functions also get a synchronous cache_lookup(*args, **kwargs)
+    returning the cached value or None, so callers can serve hits before
+    scheduling (or rate limiting) the network call.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            def cache_lookup(*args, **kwargs):
+                return _cache_load(_cacheable_path(cache_key(*args, **kwargs)))
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                path = _cacheable_path(cache_key(*args, **kwargs))
+                cached = _cache_load(path)
+                if cached is not None:
+                    return cached
+                value = await func(*args, **kwargs)
+                _cache_store(path, value)
+                return value
+
+            async_wrapper.cache_lookup = cache_lookup
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            path = _cacheable_path(cache_key(*args, **kwargs))
+            cached = _cache_load(path)
+            if cached is not None:
+                return cached
+            value = func(*args, **kwargs)
+            _cache_store(path, value)
+            return value
+
+        return wrapper
+
+    return decorator
 
+
+def _price_history_key(
+    token_id: str,
+    start_ts: int,
+    end_ts: int,
+    fidelity: int = 1,
+) -> CacheKey:
+    params = {
+        "market": token_id,
+        "startTs": start_ts,
+        "endTs": end_ts,
+        "fidelity": fidelity,
+    }
+    return f"{CLOB_HOST}/prices-history", params, end_ts
+
+
+def _market_by_slug_key(slug: str) -> CacheKey:
+    # Slugs end in the window start timestamp, e.g. eth-updown-15m-1700000000
+    try:
+        window_ts = int(slug.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return None
+    return f"{GAMMA_HOST}/markets/slug/{slug}", {}, window_ts + 900
+
+
+# ── API requests ─────────────────────────────────────────────────────────────
+
+
+@_disk_cached(_price_history_key)
 def fetch_price_history(
     token_id: str,
     start_ts: int,
@@ -71,7 +241,7 @@ def fetch_price_history(
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=15)
+        resp = _SESSION.get(url, params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
         return data.get("history", [])
@@ -80,11 +250,12 @@ def fetch_price_history(
         return []
 
 
+@_disk_cached(_market_by_slug_key)
 def _get_market_by_slug(slug: str) -> Optional[Dict[str, Any]]:
     """Fetch market data from Gamma API by slug."""
     url = f"{GAMMA_HOST}/markets/slug/{slug}"
     try:
-        resp = requests.get(url, timeout=10)
+        resp = _SESSION.get(url, timeout=10)
         if resp.status_code == 200:
             return resp.json()
         return None
@@ -114,6 +285,160 @@ def _parse_token_ids(market: Dict[str, Any]) -> Dict[str, str]:
     return result
 
 
+@_disk_cached(lambda session, *args, **kwargs: _price_history_key(*args, **kwargs))
+async def _afetch_price_history(
+    session: "aiohttp.ClientSession",
+    token_id: str,
+    start_ts: int,
+    end_ts: int,
+    fidelity: int = 1,
+) -> List[Dict[str, float]]:
+    """Async variant of fetch_price_history using a shared aiohttp session."""
+    import aiohttp
+
+    url = f"{CLOB_HOST}/prices-history"
+    params = {
+        "market": token_id,
+        "startTs": start_ts,
+        "endTs": end_ts,
+        "fidelity": fidelity,
+    }
+
+    try:
+        async with session.get(
+            url, params=params, timeout=aiohttp.ClientTimeout(total=15)
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            return data.get("history", [])
+    except Exception as e:
+        print(f"  [warn] Failed to fetch price history for {token_id}: {e}")
+        return []
+
+
+@_disk_cached(lambda session, slug: _market_by_slug_key(slug))
+async def _aget_market_by_slug(
+    session: "aiohttp.ClientSession",
+    slug: str,
+) -> Optional[Dict[str, Any]]:
+    """Async variant of _get_market_by_slug using a shared aiohttp session."""
+    import aiohttp
+
+    url = f"{GAMMA_HOST}/markets/slug/{slug}"
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status == 200:
+                return await resp.json()
+            return None
+    except Exception:
+        return None
+
+
+async def _afetch_market_history(
+    coin: str,
+    num_markets: int,
+    fidelity: int,
+) -> List[MarketData]:
+    """
+    Concurrent implementation of fetch_market_history.
+
+    Slug lookups for a batch of windows are issued together, then the
+    UP/DOWN price histories of every market found are fetched together.
+    A semaphore caps the number of in-flight requests for rate limiting.
+    """
+    import aiohttp
+
+    prefix = COIN_SLUGS[coin]
+    now = datetime.now(timezone.utc)
+
+    # Current 15-min window start
+    minute = (now.minute // 15) * 15
+    current_window = now.replace(minute=minute, second=0, microsecond=0)
+    current_ts = int(current_window.timestamp())
+
+    max_attempts = num_markets * 3  # Look back further if some fail
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def limited(fetch, *args):
+        # Cache hits are returned without waiting for a semaphore slot
+        cached = fetch.cache_lookup(*args)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            return await fetch(*args)
+
+    markets: List[MarketData] = []
+    checked = 0
+
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        while len(markets) < num_markets and checked < max_attempts:
+            # Only look up as many windows as are still missing
+            batch = min(num_markets - len(markets), max_attempts - checked)
+            window_list = [
+                current_ts - (i * 900)  # Go back 15 min each step
+                for i in range(checked + 1, checked + batch + 1)
+            ]
+            checked += batch
+
+            slugs = [f"{prefix}-{window_ts}" for window_ts in window_list]
+            for slug in slugs:
+                print(f"  Fetching market: {slug} ...")
+
+            lookups = await asyncio.gather(
+                *(limited(_aget_market_by_slug, session, slug) for slug in slugs),
+                return_exceptions=True,
+            )
+
+            found = []
+            for window_ts, slug, market in zip(window_list, slugs, lookups):
+                if not market or isinstance(market, BaseException):
+                    continue
+
+                token_ids = _parse_token_ids(market)
+                up_id = token_ids.get("up", "")
+                down_id = token_ids.get("down", "")
+                if up_id and down_id:
+                    found.append((window_ts, slug, up_id, down_id))
+
+            histories = await asyncio.gather(
+                *(
+                    limited(
+                        _afetch_price_history,
+                        session, token_id, window_ts, window_ts + 900, fidelity,
+                    )
+                    for window_ts, _, up_id, down_id in found
+                    for token_id in (up_id, down_id)
+                ),
+                return_exceptions=True,
+            )
+
+            for n, (window_ts, slug, up_id, down_id) in enumerate(found):
+                up_prices = histories[2 * n]
+                down_prices = histories[2 * n + 1]
+                if isinstance(up_prices, BaseException):
+                    up_prices = []
+                if isinstance(down_prices, BaseException):
+                    down_prices = []
+
+                if up_prices or down_prices:
+                    markets.append({
+                        "slug": slug,
+                        "start_ts": window_ts,
+                        "end_ts": window_ts + 900,
+                        "up_token_id": up_id,
+                        "down_token_id": down_id,
+                        "up_prices": up_prices,
+                        "down_prices": down_prices,
+                    })
+                    print(f"    {slug}: {len(up_prices)} up ticks, {len(down_prices)} down ticks")
+                else:
+                    print(f"    {slug}: no price data available")
+
+    print(f"  Fetched {len(markets)} markets (checked {checked} windows)")
+    return markets
+
+
 def fetch_market_history(
     coin: str = "ETH",
     num_markets: int = 10,
@@ -123,7 +448,8 @@ def fetch_market_history(
     Fetch historical 15-minute market data from Polymarket.
 
     Looks back through recent 15-minute windows and fetches
-    price history for both UP and DOWN tokens.
+    price history for both UP and DOWN tokens. Requests are
+    issued concurrently (see _afetch_market_history).
 
     Args:
         coin: Coin symbol (BTC, ETH, SOL, XRP)
@@ -131,73 +457,86 @@ def fetch_market_history(
         fidelity: Price resolution in minutes
 
     Returns:
-        List of MarketData dictionaries
+        List of MarketData dictionaries, most recent window first
     """
     coin = coin.upper()
     if coin not in COIN_SLUGS:
         raise ValueError(f"Unsupported coin: {coin}. Use: {list(COIN_SLUGS.keys())}")
 
-    prefix = COIN_SLUGS[coin]
-    now = datetime.now(timezone.utc)
+    return asyncio.run(_afetch_market_history(coin, num_markets, fidelity))
 
-    # Current 15-min window start
-    minute = (now.minute // 15) * 15
-    current_window = now.replace(minute=minute, second=0, microsecond=0)
-    current_ts = int(current_window.timestamp())
 
-    markets: List[MarketData] = []
-    checked = 0
-    max_attempts = num_markets * 3  # Look back further if some fail
+# ── Synthetic data generation ────────────────────────────────────────────────
 
-    for i in range(1, max_attempts + 1):
-        if len(markets) >= num_markets:
-            break
-
-        window_ts = current_ts - (i * 900)  # Go back 15 min each step
-        slug = f"{prefix}-{window_ts}"
-
-        print(f"  Fetching market: {slug} ...")
-        market = _get_market_by_slug(slug)
-        if not market:
-            checked += 1
-            continue
-
-        token_ids = _parse_token_ids(market)
-        up_id = token_ids.get("up", "")
-        down_id = token_ids.get("down", "")
-
-        if not up_id or not down_id:
-            checked += 1
-            continue
-
-        start_ts = window_ts
-        end_ts = window_ts + 900
-
-        up_prices = fetch_price_history(up_id, start_ts, end_ts, fidelity)
-        down_prices = fetch_price_history(down_id, start_ts, end_ts, fidelity)
-
-        if up_prices or down_prices:
-            markets.append({
-                "slug": slug,
-                "start_ts": start_ts,
-                "end_ts": end_ts,
-                "up_token_id": up_id,
-                "down_token_id": down_id,
-                "up_prices": up_prices,
-                "down_prices": down_prices,
-            })
-            print(f"    Got {len(up_prices)} up ticks, {len(down_prices)} down ticks")
-        else:
-            print(f"    No price data available")
-
-        checked += 1
-        time.sleep(0.2)  # Rate limiting
+# Pickled synthetic datasets, keyed by generation arguments
+SYNTHETIC_CACHE_DIR = Path(__file__).parent / ".cache"
 
-    print(f"  Fetched {len(markets)} markets (checked {checked} windows)")
-    return markets
+# Bump when the generator changes so stale cached datasets are not reused
+SYNTHETIC_VERSION = 2
 
 
-# ── Synthetic data generation ────────────────────────────────────────────────
+def _price_paths(
+    rng: np.random.Generator,
+    duration_seconds: int,
+    has_crash: np.ndarray,
+    crash_up: np.ndarray,
+    crash_magnitude: np.ndarray,
+    crash_time_pct: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate UP/DOWN price paths for a batch of markets at once.
+
+    Parameters are arrays with one entry per market; every random draw
+    covers the whole batch, so the work is a handful of 2-D NumPy ops.
+
+    Returns:
+        (up, down) float64 arrays of shape (num_markets, duration_seconds)
+    """
+    num_markets = len(has_crash)
+    n = duration_seconds
+
+    # Start near 0.50 with small random offset
+    start_offset = rng.uniform(-0.05, 0.05, num_markets)
+    crash_recovery_ticks = rng.integers(15, 61, num_markets)  # Recovery over 15-60 seconds
+
+    # Random walk
+    steps = rng.normal(0, 0.002, (num_markets, n))
+
+    # Flash crash injection followed by gradual recovery; a crash timed at
+    # the very end of the market (crash_time_pct=1.0) is not injected
+    crash_tick = (n * crash_time_pct).astype(np.int64)
+    injected = has_crash & (crash_tick < n)
+    crashed = np.flatnonzero(injected)
+    sign = np.where(crash_up, -1.0, 1.0)  # Opposite side crash = UP spike
+    steps[crashed, crash_tick[crashed]] += sign[crashed] * crash_magnitude[crashed]
+
+    recovery_rate = crash_magnitude / crash_recovery_ticks * 0.7
+    tick = np.arange(n)
+    recovering = (
+        injected[:, None]
+        & (tick > crash_tick[:, None])
+        & (tick <= (crash_tick + crash_recovery_ticks)[:, None])
+    )
+    steps -= recovering * (sign * recovery_rate)[:, None]
+
+    up = np.cumsum(steps, axis=1)
+    up += (0.50 + start_offset)[:, None]
+
+    # Clamp to valid range
+    np.clip(up, 0.02, 0.98, out=up)
+    down = 1.0 - up + rng.normal(0, 0.005, (num_markets, n))
+    np.clip(down, 0.02, 0.98, out=down)
+
+    # Quantize to 4 decimals in one pass per side
+    np.round(up, 4, out=up)
+    np.round(down, 4, out=down)
+    return up, down
+
+
+def _to_price_points(start_ts: int, prices: np.ndarray) -> List[Dict[str, float]]:
+    """One second-spaced [{"t": ..., "p": ...}, ...] list from a price row."""
+    ts = range(start_ts, start_ts + len(prices))
+    return [{"t": t, "p": p} for t, p in zip(ts, prices.tolist())]
 
 
 def _generate_single_market_prices(
@@ -227,46 +566,18 @@ def _generate_single_market_prices(
     Returns:
         {"up_prices": [...], "down_prices": [...]}
     """
-    rng = random.Random(seed)
-
-    # Start near 0.50 with small random offset
-    up_price = 0.50 + rng.uniform(-0.05, 0.05)
-    up_prices: List[Dict[str, float]] = []
-    down_prices: List[Dict[str, float]] = []
-
-    crash_tick = int(duration_seconds * crash_time_pct) if has_crash else -1
-    crash_recovery_ticks = rng.randint(15, 60)  # Recovery over 15-60 seconds
-
-    for tick in range(duration_seconds):
-        t = start_ts + tick
-
-        # Random walk
-        drift = rng.gauss(0, 0.002)
-        up_price += drift
-
-        # Flash crash injection
-        if has_crash and tick == crash_tick:
-            if crash_side == "up":
-                up_price -= crash_magnitude
-            else:
-                up_price += crash_magnitude  # Opposite side crash = UP spike
-
-        # Gradual recovery after crash
-        if has_crash and crash_tick < tick <= crash_tick + crash_recovery_ticks:
-            recovery_rate = crash_magnitude / crash_recovery_ticks * 0.7
-            if crash_side == "up":
-                up_price += recovery_rate
-            else:
-                up_price -= recovery_rate
-
-        # Clamp to valid range
-        up_price = max(0.02, min(0.98, up_price))
-        down_price = max(0.02, min(0.98, 1.0 - up_price + rng.gauss(0, 0.005)))
-
-        up_prices.append({"t": t, "p": round(up_price, 4)})
-        down_prices.append({"t": t, "p": round(down_price, 4)})
-
-    return {"up_prices": up_prices, "down_prices": down_prices}
+    up, down = _price_paths(
+        np.random.default_rng(seed),
+        duration_seconds,
+        has_crash=np.array([has_crash]),
+        crash_up=np.array([crash_side == "up"]),
+        crash_magnitude=np.array([crash_magnitude]),
+        crash_time_pct=np.array([crash_time_pct]),
+    )
+    return {
+        "up_prices": _to_price_points(start_ts, up[0]),
+        "down_prices": _to_price_points(start_ts, down[0]),
+    }
 
 
 def generate_synthetic_data(
@@ -279,7 +590,8 @@ def generate_synthetic_data(
 
     Creates realistic price series with configurable probability
     of flash crash events. Each market is a 15-minute window with
-    1-second fidelity (900 data points per side).
+    1-second fidelity (900 data points per side). All markets are
+    drawn from one seeded generator in a single batch.
 
     Args:
         num_markets: Number of synthetic markets
@@ -289,30 +601,24 @@ def generate_synthetic_data(
     Returns:
         List of MarketData dictionaries (same format as fetch_market_history)
     """
-    rng = random.Random(seed)
+    rng = np.random.default_rng(seed)
     base_ts = int(time.time()) - (num_markets * 900)  # Start in the past
 
+    has_crash = rng.random(num_markets) < crash_probability
+    crash_up = rng.random(num_markets) < 0.5
+    crash_magnitude = rng.uniform(0.20, 0.50, num_markets)
+    crash_time_pct = rng.uniform(0.15, 0.80, num_markets)
+
+    up, down = _price_paths(rng, 900, has_crash, crash_up, crash_magnitude, crash_time_pct)
+
     markets: List[MarketData] = []
 
-    for i in range(num_markets):
+    for i, (crashed, side_up, magnitude) in enumerate(
+        zip(has_crash.tolist(), crash_up.tolist(), crash_magnitude.tolist())
+    ):
         start_ts = base_ts + (i * 900)
         end_ts = start_ts + 900
-
-        has_crash = rng.random() < crash_probability
-        crash_side = rng.choice(["up", "down"])
-        crash_magnitude = rng.uniform(0.20, 0.50)
-        crash_time_pct = rng.uniform(0.15, 0.80)
-
-        market_seed = seed + i
-
-        prices = _generate_single_market_prices(
-            start_ts=start_ts,
-            has_crash=has_crash,
-            crash_side=crash_side,
-            crash_magnitude=crash_magnitude,
-            crash_time_pct=crash_time_pct,
-            seed=market_seed,
-        )
+        crash_side = "up" if side_up else "down"
 
         markets.append({
             "slug": f"synthetic-market-{i + 1:03d}",
@@ -320,31 +626,290 @@ def generate_synthetic_data(
             "end_ts": end_ts,
             "up_token_id": f"synthetic-up-{i + 1}",
             "down_token_id": f"synthetic-down-{i + 1}",
-            "up_prices": prices["up_prices"],
-            "down_prices": prices["down_prices"],
-            "has_crash": has_crash,
-            "crash_side": crash_side if has_crash else None,
-            "crash_magnitude": crash_magnitude if has_crash else None,
+            "up_prices": _to_price_points(start_ts, up[i]),
+            "down_prices": _to_price_points(start_ts, down[i]),
+            "has_crash": crashed,
+            "crash_side": crash_side if crashed else None,
+            "crash_magnitude": magnitude if crashed else None,
         })
 
-    crash_count = sum(1 for m in markets if m.get("has_crash"))
+    crash_count = int(has_crash.sum())
     print(f"Generated {num_markets} synthetic markets ({crash_count} with flash crashes)")
     return markets
 
 
+def load_synthetic_data(
+    num_markets: int = 20,
+    crash_probability: float = 0.3,
+    seed: int = 42,
+) -> List[MarketData]:
+    """
+    generate_synthetic_data, memoized on disk by its arguments.
+
+    Prices are a pure function of (num_markets, crash_probability, seed),
+    so repeated runs load a pickle from SYNTHETIC_CACHE_DIR instead of
+    regenerating. A cache hit keeps the timestamps of the run that wrote
+    it; prices and backtest trades are unaffected.
+    """
+    key = hashlib.blake2b(
+        repr((SYNTHETIC_VERSION, num_markets, crash_probability, seed)).encode(),
+        digest_size=8,
+    ).hexdigest()
+    path = SYNTHETIC_CACHE_DIR / f"synth-{key}.pkl"
+
+    try:
+        with open(path, "rb") as f:
+            markets = pickle.load(f)
+        print(f"Loaded {len(markets)} synthetic markets from {path}")
+        return markets
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    markets = generate_synthetic_data(
+        num_markets=num_markets,
+        crash_probability=crash_probability,
+        seed=seed,
+    )
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(markets, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return markets
+
+
+# ── JSON helpers ─────────────────────────────────────────────────────────────
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize NumPy values for the stdlib json fallback."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize to JSON bytes, using orjson when installed.
+
+    NumPy arrays and scalars are supported either way. Note that orjson
+    writes non-finite floats (e.g. an infinite profit factor) as null.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, default=_json_default).encode()
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode()
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Output directories already created by write_payload in this process
+_dirs_created: Set[Path] = set()
+
+# mkstemp creates files as 0600; published files get the usual umask mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _ensure_dir(directory: Path) -> None:
+    """mkdir -p, skipped for directories this process already created."""
+    if directory not in _dirs_created:
+        directory.mkdir(parents=True, exist_ok=True)
+        _dirs_created.add(directory)
+
+
+def _atomic_write(path: Path, payload: bytes) -> os.stat_result:
+    """
+    Write payload to a unique temp file beside path, then rename it over path.
+
+    Each call gets its own temp file, so concurrent writers never share
+    one; the last rename wins with a complete file. Returns the stat of
+    the file as published.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            stat = os.fstat(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return stat
+
+
+def _payload_digest(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _sidecar_record(digest: str, stat: os.stat_result) -> str:
+    """Digest plus the identity of the file it was computed for."""
+    return f"{digest} {stat.st_size} {stat.st_mtime_ns} {stat.st_ino}"
+
+
+def _is_unchanged(path: Path, payload: bytes, digest: str) -> bool:
+    """
+    Check whether path already holds payload.
+
+    The .sha sidecar is trusted only while the file still has the size,
+    mtime and inode recorded with it; otherwise the file is hashed.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return False
+    if stat.st_size != len(payload):
+        return False
+    sidecar = path.with_suffix(path.suffix + ".sha")
+    try:
+        if sidecar.read_text() == _sidecar_record(digest, stat):
+            return True
+    except FileNotFoundError:
+        pass
+    return _payload_digest(path.read_bytes()) == digest
+
+
+def write_payload(payload: bytes, filepath: str) -> bool:
+    """
+    Write serialized bytes to filepath, creating parent dirs.
+
+    The bytes go to a unique sibling temp file that is then renamed over
+    the target, so readers never see a half-written file. If the file already
+    holds identical bytes it is left untouched (keeping file watchers
+    quiet); a .sha sidecar with the content digest and the file's stat
+    makes that check cheap while the file is untouched.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    path = Path(filepath)
+    digest = _payload_digest(payload)
+    if _is_unchanged(path, payload, digest):
+        return False
+
+    directory = path.parent.absolute()
+    _ensure_dir(directory)
+    try:
+        stat = _atomic_write(path, payload)
+    except FileNotFoundError:
+        # Directory removed since it was cached; recreate and retry once
+        _dirs_created.discard(directory)
+        _ensure_dir(directory)
+        stat = _atomic_write(path, payload)
+    sidecar = path.with_suffix(path.suffix + ".sha")
+    _atomic_write(sidecar, _sidecar_record(digest, stat).encode())
+    return True
+
+
+def dump_json(obj: Any, filepath: str, indent: bool = False) -> bool:
+    """
+    Serialize obj as JSON and write it to filepath, creating parent dirs.
+
+    Output is compact by default; pass indent=True for human-readable files.
+    """
+    return write_payload(json_dumps(obj, indent=indent), filepath)
+
+
 # ── Caching helpers ──────────────────────────────────────────────────────────
 
+# Market data files ending in this suffix use the binary columnar format
+NPZ_SUFFIX = ".npz"
+
+_PRICE_KEYS = ("up_prices", "down_prices")
+
+
+def _save_npz(data: List[MarketData], filepath: str) -> None:
+    """
+    Save market data as compressed column arrays.
+
+    Each side's ticks are concatenated into t / p arrays with per-market
+    offsets; the remaining per-market fields are stored as JSON bytes so
+    the file loads without pickle.
+    """
+    meta = [{k: v for k, v in m.items() if k not in _PRICE_KEYS} for m in data]
+    arrays = {"meta": np.frombuffer(json_dumps(meta), dtype=np.uint8)}
+    for key in _PRICE_KEYS:
+        prices = [m.get(key, []) for m in data]
+        offsets = np.zeros(len(data) + 1, dtype=np.int64)
+        np.cumsum([len(points) for points in prices], out=offsets[1:])
+        arrays[f"{key}_offsets"] = offsets
+        arrays[f"{key}_t"] = np.array([p["t"] for points in prices for p in points])
+        arrays[f"{key}_p"] = np.array(
+            [p["p"] for points in prices for p in points], dtype=np.float64
+        )
 
-def save_data(data: List[MarketData], filepath: str) -> None:
-    """Save market data to JSON file."""
     path = Path(filepath)
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+def _iter_npz(filepath: str) -> Iterator[MarketData]:
+    """Rebuild market dicts from a file written by _save_npz, one at a time."""
+    with np.load(filepath, allow_pickle=False) as npz:
+        meta = json_loads(npz["meta"].tobytes())
+        columns = {
+            key: (npz[f"{key}_offsets"], npz[f"{key}_t"], npz[f"{key}_p"])
+            for key in _PRICE_KEYS
+        }
+
+    for i, market in enumerate(meta):
+        for key, (offsets, ts, ps) in columns.items():
+            lo, hi = offsets[i], offsets[i + 1]
+            market[key] = [
+                {"t": t, "p": p} for t, p in zip(ts[lo:hi].tolist(), ps[lo:hi].tolist())
+            ]
+        yield market
+
+
+def save_data(data: List[MarketData], filepath: str) -> None:
+    """Save market data to a JSON file, or column arrays for .npz paths."""
+    if Path(filepath).suffix == NPZ_SUFFIX:
+        _save_npz(data, filepath)
+    else:
+        dump_json(data, filepath)
     print(f"Saved {len(data)} markets to {filepath}")
 
 
 def load_data(filepath: str) -> List[MarketData]:
-    """Load market data from JSON file."""
-    with open(filepath, "r") as f:
-        return json.load(f)
+    """Load market data saved by save_data (JSON or .npz)."""
+    if Path(filepath).suffix == NPZ_SUFFIX:
+        return list(_iter_npz(filepath))
+    return json_loads(Path(filepath).read_bytes())
+
+
+def iter_data(filepath: str) -> Iterator[MarketData]:
+    """
+    Stream market data one market at a time.
+
+    Only the market being consumed is held as Python objects, so a
+    single-pass backtest over a large cached dataset does not have to
+    materialize the whole list. JSON files are streamed with ijson and
+    fall back to load_data when it is not installed; .npz files keep
+    their compact arrays and build each market's dicts on demand.
+    """
+    if Path(filepath).suffix == NPZ_SUFFIX:
+        yield from _iter_npz(filepath)
+        return
+    if ijson is None:
+        yield from load_data(filepath)
+        return
+    with open(filepath, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
@@ -2,8 +2,9 @@
 Backtest Engine - Tick-by-Tick Flash Crash Strategy Simulation
 
 Replays the flash crash strategy logic against historical or synthetic
-market data. Reuses the actual PriceTracker and PositionManager from
-the live bot to ensure identical behavior.
+market data. The per-tick loop runs in a Numba-compiled kernel
+(backtest/_kernels.py) that mirrors the live bot's PriceTracker
+detection, evaluated in market time rather than wall-clock time.
 
 Usage:
     from backtest.engine import BacktestEngine, BacktestConfig
@@ -17,11 +18,45 @@ Usage:
 """
 
 import json
-import math
+import multiprocessing
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from functools import cached_property, partial
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from lib.price_tracker import PriceTracker
+import numpy as np
+
+from backtest._kernels import (
+    EXIT_MARKET_END,
+    _merge_sorted,
+    _simulate_all,
+    _simulate_market,
+)
+
+
+# Indexed by the kernels' integer side / exit type codes
+SIDE_NAMES = ("up", "down")
+EXIT_TYPE_NAMES = ("market_end", "take_profit", "stop_loss")
+
+# Trade fields emitted as float64 columns by BacktestResult.to_columns
+TRADE_NUMERIC_FIELDS = (
+    "entry_price",
+    "exit_price",
+    "entry_time",
+    "exit_time",
+    "size_usdc",
+    "size_shares",
+    "pnl",
+)
+
+# Markets per process-pool task, and tasks in flight per worker
+POOL_BATCH_SIZE = 16
+POOL_TASKS_PER_WORKER = 2
 
 
 # ── Config & Data Classes ────────────────────────────────────────────────────
@@ -42,6 +77,8 @@ class BacktestConfig:
     # Position sizing
     size: float = 5.0  # USDC per trade
     max_positions: int = 1
+    # Allow a new entry in a market after a TP/SL exit in that market
+    allow_reentry: bool = True
 
     # Starting equity
     starting_equity: float = 100.0
@@ -54,6 +91,7 @@ class BacktestConfig:
             "stop_loss": self.stop_loss,
             "size": self.size,
             "max_positions": self.max_positions,
+            "allow_reentry": self.allow_reentry,
             "starting_equity": self.starting_equity,
         }
 
@@ -73,7 +111,11 @@ class Trade:
     pnl: float
     exit_type: str  # "take_profit", "stop_loss", "market_end"
 
-    def to_dict(self) -> Dict[str, Any]:
+    @cached_property
+    def _rounded(self) -> Dict[str, Any]:
+        # Quantized once per trade; the fields themselves keep full
+        # precision so the result statistics are not computed from
+        # rounded PnL.
         return {
             "market_slug": self.market_slug,
             "side": self.side,
@@ -87,6 +129,9 @@ class Trade:
             "exit_type": self.exit_type,
         }
 
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._rounded)
+
 
 @dataclass
 class BacktestResult:
@@ -94,13 +139,76 @@ class BacktestResult:
 
     config: BacktestConfig
     trades: List[Trade]
-    equity_curve: List[Dict[str, float]]
+    equity_times: np.ndarray  # float64 timestamps of equity samples
+    equity_values: np.ndarray  # float64 equity at each sample
     data_source: str  # "live" or "synthetic"
     markets_analyzed: int
 
+    @property
+    def equity_curve(self) -> List[Dict[str, float]]:
+        """Equity samples as [{"time": ..., "equity": ...}, ...]."""
+        return [
+            {"time": t, "equity": e}
+            for t, e in zip(self.equity_times.tolist(), self.equity_values.tolist())
+        ]
+
+    @cached_property
+    def _stats(self) -> Dict[str, float]:
+        """
+        Trade and equity statistics, computed together from NumPy arrays.
+
+        Cached on first access; results are not updated if trades or the
+        equity curve are mutated afterwards.
+        """
+        pnls = np.fromiter(
+            (t.pnl for t in self.trades), dtype=np.float64, count=len(self.trades)
+        )
+        is_win = pnls > 0
+        wins = pnls[is_win]
+        losses = pnls[~is_win]
+
+        gross_profit = float(wins.sum())
+        gross_loss = abs(float(pnls[pnls < 0].sum()))
+        if gross_loss == 0:
+            profit_factor = float("inf") if gross_profit > 0 else 0.0
+        else:
+            profit_factor = gross_profit / gross_loss
+
+        # Simplified Sharpe ratio (no risk-free rate)
+        sharpe = 0.0
+        if len(pnls) >= 2:
+            std = float(pnls.std(ddof=1))
+            if std > 0:
+                sharpe = float(pnls.mean()) / std
+
+        # Drawdown is a memory-bound running-max scan (one read per equity
+        # point, almost no arithmetic), so it is left to NumPy's vectorized
+        # ufuncs rather than compiled; both drawdown figures share the scan.
+        max_dd = 0.0
+        max_dd_dollars = 0.0
+        if len(self.equity_values):
+            eq = self.equity_values
+            peaks = np.maximum.accumulate(eq)
+            drawdowns = peaks - eq
+            max_dd_dollars = float(drawdowns.max())
+            dd_pct = np.divide(drawdowns, peaks, out=np.zeros_like(eq), where=peaks > 0)
+            max_dd = float(dd_pct.max() * 100)
+
+        return {
+            "total_pnl": float(pnls.sum()),
+            "winning_trades": int(is_win.sum()),
+            "losing_trades": len(losses),
+            "avg_win": float(wins.mean()) if len(wins) else 0.0,
+            "avg_loss": float(losses.mean()) if len(losses) else 0.0,
+            "profit_factor": profit_factor,
+            "sharpe_ratio": sharpe,
+            "max_drawdown": max_dd,
+            "max_drawdown_dollars": max_dd_dollars,
+        }
+
     @property
     def total_pnl(self) -> float:
-        return sum(t.pnl for t in self.trades)
+        return self._stats["total_pnl"]
 
     @property
     def total_trades(self) -> int:
@@ -108,11 +216,11 @@ class BacktestResult:
 
     @property
     def winning_trades(self) -> int:
-        return sum(1 for t in self.trades if t.pnl > 0)
+        return self._stats["winning_trades"]
 
     @property
     def losing_trades(self) -> int:
-        return sum(1 for t in self.trades if t.pnl <= 0)
+        return self._stats["losing_trades"]
 
     @property
     def win_rate(self) -> float:
@@ -122,62 +230,28 @@ class BacktestResult:
 
     @property
     def avg_win(self) -> float:
-        wins = [t.pnl for t in self.trades if t.pnl > 0]
-        return sum(wins) / len(wins) if wins else 0.0
+        return self._stats["avg_win"]
 
     @property
     def avg_loss(self) -> float:
-        losses = [t.pnl for t in self.trades if t.pnl <= 0]
-        return sum(losses) / len(losses) if losses else 0.0
+        return self._stats["avg_loss"]
 
     @property
     def profit_factor(self) -> float:
-        gross_profit = sum(t.pnl for t in self.trades if t.pnl > 0)
-        gross_loss = abs(sum(t.pnl for t in self.trades if t.pnl < 0))
-        if gross_loss == 0:
-            return float("inf") if gross_profit > 0 else 0.0
-        return gross_profit / gross_loss
+        return self._stats["profit_factor"]
 
     @property
     def max_drawdown(self) -> float:
-        if not self.equity_curve:
-            return 0.0
-        peak = self.equity_curve[0]["equity"]
-        max_dd = 0.0
-        for point in self.equity_curve:
-            eq = point["equity"]
-            if eq > peak:
-                peak = eq
-            dd = (peak - eq) / peak * 100 if peak > 0 else 0.0
-            max_dd = max(max_dd, dd)
-        return max_dd
+        return self._stats["max_drawdown"]
 
     @property
     def max_drawdown_dollars(self) -> float:
-        if not self.equity_curve:
-            return 0.0
-        peak = self.equity_curve[0]["equity"]
-        max_dd = 0.0
-        for point in self.equity_curve:
-            eq = point["equity"]
-            if eq > peak:
-                peak = eq
-            dd = peak - eq
-            max_dd = max(max_dd, dd)
-        return max_dd
+        return self._stats["max_drawdown_dollars"]
 
     @property
     def sharpe_ratio(self) -> float:
         """Simplified Sharpe ratio (no risk-free rate)."""
-        if len(self.trades) < 2:
-            return 0.0
-        pnls = [t.pnl for t in self.trades]
-        avg = sum(pnls) / len(pnls)
-        variance = sum((p - avg) ** 2 for p in pnls) / (len(pnls) - 1)
-        std = math.sqrt(variance) if variance > 0 else 0.0
-        if std == 0:
-            return 0.0
-        return avg / std
+        return self._stats["sharpe_ratio"]
 
     @property
     def return_pct(self) -> float:
@@ -225,8 +299,8 @@ class BacktestResult:
         lines.append("=" * 60)
         return "\n".join(lines)
 
-    def to_json(self) -> Dict[str, Any]:
-        """Serialize to JSON-compatible dictionary."""
+    def _header(self) -> Dict[str, Any]:
+        """Config, data source and summary shared by both JSON layouts."""
         exit_counts: Dict[str, int] = {}
         for t in self.trades:
             exit_counts[t.exit_type] = exit_counts.get(t.exit_type, 0) + 1
@@ -250,13 +324,379 @@ class BacktestResult:
                 "sharpe_ratio": round(self.sharpe_ratio, 2),
                 "exit_counts": exit_counts,
             },
+        }
+
+    @cached_property
+    def _json(self) -> Dict[str, Any]:
+        """
+        Row layout built once per result.
+
+        Cached on first access; not updated if trades or the equity curve
+        are mutated afterwards.
+        """
+        return {
+            **self._header(),
             "trades": [t.to_dict() for t in self.trades],
             "equity_curve": [
-                {"time": round(p["time"], 2), "equity": round(p["equity"], 4)}
-                for p in self.equity_curve
+                {"time": round(t, 2), "equity": round(e, 4)}
+                for t, e in zip(self.equity_times.tolist(), self.equity_values.tolist())
             ],
         }
 
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Serialize to JSON-compatible dictionary (the dashboard's row layout).
+
+        Returns a new top-level dict; the nested summary, trade and equity
+        entries are shared between calls and should not be modified.
+        """
+        return dict(self._json)
+
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        Serialize with trades and equity as column arrays.
+
+        Numeric columns are float64 NumPy arrays at full precision, which
+        json_dumps hands to orjson without building a dict per trade or
+        equity point. Same header as to_json; not read by the dashboard.
+        """
+        trades = self.trades
+
+        def column(name: str) -> np.ndarray:
+            return np.fromiter(
+                (getattr(t, name) for t in trades), dtype=np.float64, count=len(trades)
+            )
+
+        return {
+            **self._header(),
+            "trades": {
+                "market_slug": [t.market_slug for t in trades],
+                "side": [t.side for t in trades],
+                **{name: column(name) for name in TRADE_NUMERIC_FIELDS},
+                "exit_type": [t.exit_type for t in trades],
+            },
+            "equity_curve": {
+                "time": self.equity_times,
+                "equity": self.equity_values,
+            },
+        }
+
+
+# ── Packed market data ───────────────────────────────────────────────────────
+
+
+@dataclass
+class _PackedMarkets:
+    """
+    Merged tick timelines of all markets, concatenated into flat arrays.
+
+    Market i's ticks are ts/up/down[offsets[i]:offsets[i + 1]]. Built once
+    per engine so repeated runs (e.g. parameter grids) skip the merge;
+    process-based grids hand the arrays to workers through
+    _SharedPackedMarkets instead of pickling them into every task.
+    """
+
+    slugs: List[str]
+    start_ts: List[Any]
+    end_ts: List[Any]
+    offsets: np.ndarray
+    ts: np.ndarray
+    up: np.ndarray
+    down: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.slugs)
+
+    def ticks(self, i: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Views of market i's (ts, up, down) arrays."""
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.ts[lo:hi], self.up[lo:hi], self.down[lo:hi]
+
+    @classmethod
+    def from_merged(
+        cls,
+        slugs: List[str],
+        start_ts: List[Any],
+        end_ts: List[Any],
+        merged: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    ) -> "_PackedMarkets":
+        """Concatenate per-market (ts, up, down) arrays."""
+        lengths = [len(ts) for ts, _, _ in merged]
+        offsets = np.zeros(len(merged) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        def concat(k: int) -> np.ndarray:
+            if not merged:
+                return np.empty(0, dtype=np.float64)
+            return np.concatenate([arrays[k] for arrays in merged])
+
+        return cls(
+            slugs=slugs,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            offsets=offsets,
+            ts=concat(0),
+            up=concat(1),
+            down=concat(2),
+        )
+
+
+@dataclass
+class _SharedPackedMarkets:
+    """
+    Picklable handle to _PackedMarkets arrays held in one SharedMemory block.
+
+    The block is laid out as offsets (int64) followed by ts, up and down
+    (float64). Only its name and the per-market metadata are pickled;
+    workers map the block and rebuild the arrays as zero-copy views.
+    """
+
+    name: str
+    num_ticks: int
+    slugs: List[str]
+    start_ts: List[Any]
+    end_ts: List[Any]
+
+    @classmethod
+    @contextmanager
+    def create(cls, packed: _PackedMarkets) -> Iterator["_SharedPackedMarkets"]:
+        """Copy packed into a new block, unlinked when the context exits."""
+        num_words = len(packed.offsets) + 3 * len(packed.ts)
+        shm = shared_memory.SharedMemory(create=True, size=8 * num_words)
+        try:
+            shared = cls(
+                name=shm.name,
+                num_ticks=len(packed.ts),
+                slugs=packed.slugs,
+                start_ts=packed.start_ts,
+                end_ts=packed.end_ts,
+            )
+            view = shared.view(shm.buf)
+            for name in ("offsets", "ts", "up", "down"):
+                getattr(view, name)[:] = getattr(packed, name)
+            del view  # release the buffer exports before close()
+            yield shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def attach(self) -> shared_memory.SharedMemory:
+        """
+        Open the block from a worker; only the creating process unlinks it.
+
+        Before Python 3.13 attaching also registers the block with the
+        resource tracker. joblib's workers share the parent's tracker, so
+        that registration is a no-op rather than a second owner.
+        """
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=self.name, track=False)
+        return shared_memory.SharedMemory(name=self.name)
+
+    def view(self, buf: memoryview) -> _PackedMarkets:
+        """_PackedMarkets whose arrays are views into buf."""
+        num_offsets = len(self.slugs) + 1
+        offsets = np.ndarray((num_offsets,), dtype=np.int64, buffer=buf)
+        ts, up, down = np.ndarray(
+            (3, self.num_ticks), dtype=np.float64, buffer=buf, offset=8 * num_offsets
+        )
+        return _PackedMarkets(
+            slugs=self.slugs,
+            start_ts=self.start_ts,
+            end_ts=self.end_ts,
+            offsets=offsets,
+            ts=ts,
+            up=up,
+            down=down,
+        )
+
+
+# Per-market kernel output: (entry_idx, exit_idx, side, entry_px, exit_px, exit_type)
+MarketTrades = Tuple[np.ndarray, ...]
+
+
+def _kernel_args(config: BacktestConfig) -> Tuple[Any, ...]:
+    """Strategy parameters in the order the market kernels take them."""
+    return (
+        config.drop_threshold,
+        config.lookback_seconds,
+        config.take_profit,
+        config.stop_loss,
+        config.allow_reentry,
+    )
+
+
+def _simulate_packed(
+    config: BacktestConfig,
+    packed: _PackedMarkets,
+    parallel: bool = True,
+) -> List[MarketTrades]:
+    """Run the market kernel over every packed market."""
+    args = _kernel_args(config)
+
+    if not parallel:
+        return [_simulate_market(*packed.ticks(m), *args) for m in range(len(packed))]
+
+    *outputs, counts = _simulate_all(
+        packed.ts, packed.up, packed.down, packed.offsets, *args
+    )
+    results: List[MarketTrades] = []
+    for m in range(len(packed)):
+        lo = packed.offsets[m]
+        hi = lo + counts[m]
+        results.append(tuple(a[lo:hi] for a in outputs))
+    return results
+
+
+def _run_one_market(config: BacktestConfig, market: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Merge and simulate a single market (worker-process entry point).
+
+    Returns:
+        (slug, start_ts, end_ts, (ts, up, down), MarketTrades)
+    """
+    ticks = BacktestEngine._merge_ticks_soa(
+        market.get("up_prices", []), market.get("down_prices", [])
+    )
+    trades = _simulate_market(*ticks, *_kernel_args(config))
+    return market["slug"], market.get("start_ts"), market.get("end_ts"), ticks, trades
+
+
+def _run_market_batch(
+    config: BacktestConfig, markets: List[Dict[str, Any]]
+) -> List[Tuple[Any, ...]]:
+    """Run _run_one_market over a batch, amortizing per-task IPC."""
+    return [_run_one_market(config, market) for market in markets]
+
+
+def _run_shared(
+    config: BacktestConfig, shared: _SharedPackedMarkets, data_source: str
+) -> BacktestResult:
+    """Run one grid config on shared packed markets (worker entry point)."""
+    shm = shared.attach()
+    try:
+        packed = shared.view(shm.buf)
+        result = _run_packed(config, packed, data_source, parallel=False)
+        del packed  # release the buffer exports before close()
+        return result
+    finally:
+        shm.close()
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for worker processes.
+
+    Forking after Numba's parallel kernel has started its thread pool
+    leaves the process hung at exit, so workers always start from a fresh
+    interpreter (forkserver where available, otherwise spawn).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _run_packed(
+    config: BacktestConfig,
+    packed: _PackedMarkets,
+    data_source: str,
+    parallel: bool = True,
+    market_trades: Optional[List[MarketTrades]] = None,
+) -> BacktestResult:
+    """
+    Run the backtest over packed markets.
+
+    Trade detection runs for all markets at once (in parallel unless
+    parallel=False), unless market_trades already holds the kernel output
+    per market; equity is then aggregated serially in market order.
+    Module-level so it can be pickled and dispatched to worker processes.
+    """
+    if market_trades is None:
+        market_trades = _simulate_packed(config, packed, parallel)
+
+    all_trades: List[Trade] = []
+    equity = config.starting_equity
+    global_tick = 0
+
+    # Upper bound: one sample per 10 ticks, one per market boundary, and
+    # slot 0 reserved for the starting equity point
+    capacity = len(packed.ts) // 10 + len(packed) + 1
+    equity_times = np.empty(capacity, dtype=np.float64)
+    equity_values = np.empty(capacity, dtype=np.float64)
+    k = 1
+
+    for m in range(len(packed)):
+        ts, up, down = packed.ticks(m)
+        if len(ts) == 0:
+            continue
+
+        slug = packed.slugs[m]
+        end_ts = packed.end_ts[m]
+        entry_idx, exit_idx, sides, entry_px, exit_px, exit_types = market_trades[m]
+
+        shares = config.size / entry_px
+        pnls = (exit_px - entry_px) * shares
+
+        # Convert once per market so the trade loop only touches Python scalars;
+        # market_end exits (exit_idx == len(ts)) are stamped with end_ts below
+        entry_times = ts[entry_idx].tolist()
+        exit_times = ts[np.minimum(exit_idx, len(ts) - 1)].tolist()
+        for side, e_px, x_px, e_t, x_t, code, n_shares, pnl in zip(
+            sides.tolist(),
+            entry_px.tolist(),
+            exit_px.tolist(),
+            entry_times,
+            exit_times,
+            exit_types.tolist(),
+            shares.tolist(),
+            pnls.tolist(),
+        ):
+            all_trades.append(Trade(
+                market_slug=slug,
+                side=SIDE_NAMES[side],
+                entry_price=e_px,
+                exit_price=x_px,
+                entry_time=e_t,
+                exit_time=end_ts if code == EXIT_MARKET_END else x_t,
+                size_usdc=config.size,
+                size_shares=n_shares,
+                pnl=pnl,
+                exit_type=EXIT_TYPE_NAMES[code],
+            ))
+
+        # Equity after each exit, accumulated in trade order
+        equity_after = np.cumsum(np.concatenate(([equity], pnls)))
+
+        # Sample every 10 global ticks; equity includes exits on that tick
+        sample_idx = np.arange(-(global_tick + 1) % 10, len(ts), 10)
+        closed = np.searchsorted(exit_idx, sample_idx, side="right")
+        num_samples = len(sample_idx)
+        equity_times[k:k + num_samples] = ts[sample_idx]
+        equity_values[k:k + num_samples] = equity_after[closed]
+        k += num_samples
+        global_tick += len(ts)
+
+        equity = float(equity_after[-1])
+
+        # Record equity at market boundary
+        equity_times[k] = end_ts
+        equity_values[k] = equity
+        k += 1
+
+    # Ensure first equity point exists
+    first = 1
+    if k > 1 and equity_values[1] != config.starting_equity:
+        first = 0
+        equity_times[0] = packed.start_ts[0]
+        equity_values[0] = config.starting_equity
+
+    return BacktestResult(
+        config=config,
+        trades=all_trades,
+        equity_times=equity_times[first:k],
+        equity_values=equity_values[first:k],
+        data_source=data_source,
+        markets_analyzed=len(packed),
+    )
+
 
 # ── Backtest Engine ──────────────────────────────────────────────────────────
 
@@ -265,202 +705,213 @@ class BacktestEngine:
     """
     Tick-by-tick backtest engine for the Flash Crash strategy.
 
-    Replays market data through the same PriceTracker used by the live bot
-    to detect flash crashes, then simulates position entry/exit with TP/SL.
+    Replays market data through a compiled port of the live bot's
+    PriceTracker to detect flash crashes, then simulates position
+    entry/exit with TP/SL.
     """
 
     def __init__(
         self,
         config: BacktestConfig,
-        markets: List[Dict[str, Any]],
+        markets: Iterable[Dict[str, Any]],
         data_source: str = "synthetic",
     ):
         self.config = config
         self.markets = markets
         self.data_source = data_source
+        self._packed: Optional[_PackedMarkets] = None
 
-    def run(self) -> BacktestResult:
+    def run(self, workers: int = 1) -> BacktestResult:
         """
         Run the full backtest across all markets.
 
+        Args:
+            workers: Worker processes used to merge and simulate markets.
+                With 1 (default) markets are merged in this process and
+                simulated on Numba's thread pool. Each market is pickled to
+                a worker and its merged arrays pickled back, which costs
+                about as much as merging it here, so more workers are
+                rarely faster; the single-process path is the one to use
+                unless profiling says otherwise. Ignored once markets have
+                been merged.
+
         Returns:
             BacktestResult with trades, equity curve, and statistics
         """
-        all_trades: List[Trade] = []
-        equity = self.config.starting_equity
-        equity_curve: List[Dict[str, float]] = []
-        global_tick = 0
-
-        for market_idx, market in enumerate(self.markets):
-            slug = market["slug"]
-            up_prices = market.get("up_prices", [])
-            down_prices = market.get("down_prices", [])
-
-            if not up_prices and not down_prices:
-                continue
-
-            # Fresh PriceTracker per market (same as live bot clears on market change)
-            tracker = PriceTracker(
-                lookback_seconds=self.config.lookback_seconds,
-                max_history=100,
+        if workers > 1 and self._packed is None:
+            return self._run_pool(workers)
+        return _run_packed(self.config, self._pack_markets(), self.data_source)
+
+    def run_grid(
+        self,
+        configs: List[BacktestConfig],
+        n_jobs: int = -1,
+        backend: str = "loky",
+    ) -> List[BacktestResult]:
+        """
+        Run the backtest once per config, in parallel.
+
+        Each run is independent, so the grid is spread across processes
+        with joblib. Markets are merged once and copied into a single
+        shared memory block that every worker maps, so tasks only pickle
+        the block name and per-market metadata. Each run simulates its
+        markets serially to avoid nesting Numba's thread pool inside the
+        workers.
+
+        Args:
+            configs: Strategy configurations to evaluate
+            n_jobs: Number of workers (-1 = all cores)
+            backend: joblib backend ("loky" for processes, "threading")
+
+        Returns:
+            One BacktestResult per config, in the same order
+        """
+        from joblib import Parallel, delayed
+
+        packed = self._pack_markets()
+        if backend == "threading":
+            return Parallel(n_jobs=n_jobs, backend=backend)(
+                delayed(_run_packed)(config, packed, self.data_source, parallel=False)
+                for config in configs
             )
-            tracker.drop_threshold = self.config.drop_threshold
-
-            # Position state for this market
-            open_position: Optional[Dict[str, Any]] = None
-
-            # Build unified tick timeline
-            ticks = self._merge_ticks(up_prices, down_prices)
-
-            for tick_data in ticks:
-                t = tick_data["t"]
-                up_p = tick_data.get("up")
-                down_p = tick_data.get("down")
-
-                # Record prices (same as live bot)
-                if up_p is not None and up_p > 0:
-                    tracker.record("up", up_p, timestamp=t)
-                if down_p is not None and down_p > 0:
-                    tracker.record("down", down_p, timestamp=t)
-
-                current_prices = {}
-                if up_p is not None:
-                    current_prices["up"] = up_p
-                if down_p is not None:
-                    current_prices["down"] = down_p
-
-                # --- Check exits for open position ---
-                if open_position is not None:
-                    side = open_position["side"]
-                    current_price = current_prices.get(side, 0)
-
-                    if current_price > 0:
-                        entry_price = open_position["entry_price"]
-                        tp_price = entry_price + self.config.take_profit
-                        sl_price = entry_price - self.config.stop_loss
-
-                        exit_type = None
-                        exit_price = current_price
-
-                        if current_price >= tp_price:
-                            exit_type = "take_profit"
-                            exit_price = tp_price  # Assume fill at TP level
-                        elif current_price <= sl_price:
-                            exit_type = "stop_loss"
-                            exit_price = sl_price  # Assume fill at SL level
-
-                        if exit_type:
-                            shares = open_position["size_shares"]
-                            pnl = (exit_price - entry_price) * shares
-                            trade = Trade(
-                                market_slug=slug,
-                                side=side,
-                                entry_price=entry_price,
-                                exit_price=exit_price,
-                                entry_time=open_position["entry_time"],
-                                exit_time=t,
-                                size_usdc=self.config.size,
-                                size_shares=shares,
-                                pnl=pnl,
-                                exit_type=exit_type,
-                            )
-                            all_trades.append(trade)
-                            equity += pnl
-                            open_position = None
-
-                # --- Check for flash crash entry ---
-                if open_position is None:
-                    event = tracker.detect_flash_crash()
-                    if event:
-                        side = event.side
-                        entry_price = current_prices.get(side, 0)
-                        if entry_price > 0:
-                            shares = self.config.size / entry_price
-                            open_position = {
-                                "side": side,
-                                "entry_price": entry_price,
-                                "entry_time": t,
-                                "size_shares": shares,
-                            }
-
-                # Record equity
-                global_tick += 1
-                if global_tick % 10 == 0:  # Sample every 10 ticks
-                    equity_curve.append({"time": t, "equity": equity})
-
-            # --- Market end: force-close any open position ---
-            if open_position is not None:
-                side = open_position["side"]
-                # Use last known price
-                last_price = 0.0
-                price_list = up_prices if side == "up" else down_prices
-                if price_list:
-                    last_price = price_list[-1]["p"]
-
-                if last_price > 0:
-                    entry_price = open_position["entry_price"]
-                    shares = open_position["size_shares"]
-                    pnl = (last_price - entry_price) * shares
-                    trade = Trade(
-                        market_slug=slug,
-                        side=side,
-                        entry_price=entry_price,
-                        exit_price=last_price,
-                        entry_time=open_position["entry_time"],
-                        exit_time=market["end_ts"],
-                        size_usdc=self.config.size,
-                        size_shares=shares,
-                        pnl=pnl,
-                        exit_type="market_end",
-                    )
-                    all_trades.append(trade)
-                    equity += pnl
-                    open_position = None
-
-            # Record equity at market boundary
-            equity_curve.append({"time": market["end_ts"], "equity": equity})
-
-        # Ensure first equity point exists
-        if equity_curve and equity_curve[0]["equity"] != self.config.starting_equity:
-            equity_curve.insert(
-                0,
-                {
-                    "time": self.markets[0]["start_ts"] if self.markets else 0,
-                    "equity": self.config.starting_equity,
-                },
+
+        with _SharedPackedMarkets.create(packed) as shared:
+            return Parallel(n_jobs=n_jobs, backend=backend)(
+                delayed(_run_shared)(config, shared, self.data_source)
+                for config in configs
             )
 
-        return BacktestResult(
-            config=self.config,
-            trades=all_trades,
-            equity_curve=equity_curve,
-            data_source=self.data_source,
-            markets_analyzed=len(self.markets),
+    def _run_pool(self, workers: int) -> BacktestResult:
+        """
+        Merge and simulate markets in a process pool, then aggregate.
+
+        Markets are read from self.markets in batches and only a bounded
+        number of batches is in flight, so iterator input (data.iter_data)
+        is still streamed. Results are collected in submission order, which
+        equity aggregation needs.
+        """
+        slugs, start_ts, end_ts, merged, market_trades = [], [], [], [], []
+
+        def collect(future) -> None:
+            for slug, start, end, ticks, trades in future.result():
+                slugs.append(slug)
+                start_ts.append(start)
+                end_ts.append(end)
+                merged.append(ticks)
+                market_trades.append(trades)
+
+        markets = iter(self.markets)
+        batches = iter(lambda: list(islice(markets, POOL_BATCH_SIZE)), [])
+        run_batch = partial(_run_market_batch, self.config)
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+            for batch in batches:
+                pending.append(pool.submit(run_batch, batch))
+                if len(pending) >= workers * POOL_TASKS_PER_WORKER:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+
+        self._packed = _PackedMarkets.from_merged(slugs, start_ts, end_ts, merged)
+        return _run_packed(
+            self.config, self._packed, self.data_source, market_trades=market_trades
         )
 
-    def _merge_ticks(
-        self,
+    def _pack_markets(self) -> _PackedMarkets:
+        """Merge every market's ticks into flat arrays (cached)."""
+        if self._packed is not None:
+            return self._packed
+
+        # Single pass so `markets` may be a one-shot iterator (see
+        # data.iter_data): each market's dicts can be freed once merged
+        slugs, start_ts, end_ts, merged = [], [], [], []
+        for m in self.markets:
+            slugs.append(m["slug"])
+            start_ts.append(m.get("start_ts"))
+            end_ts.append(m.get("end_ts"))
+            merged.append(self._merge_ticks_soa(m.get("up_prices", []), m.get("down_prices", [])))
+
+        self._packed = _PackedMarkets.from_merged(slugs, start_ts, end_ts, merged)
+        return self._packed
+
+    @classmethod
+    def _merge_ticks_soa(
+        cls,
         up_prices: List[Dict[str, float]],
         down_prices: List[Dict[str, float]],
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Merge UP and DOWN price ticks into a single chronological timeline.
 
-        When both sides have a price at the same timestamp, they're merged
-        into a single tick. Otherwise, only the available side is included.
-        """
-        up_by_t = {p["t"]: p["p"] for p in up_prices}
-        down_by_t = {p["t"]: p["p"] for p in down_prices}
-
-        all_times = sorted(set(up_by_t.keys()) | set(down_by_t.keys()))
+        Returns three parallel float64 arrays (ts, up, down). When only one
+        side has a price at a timestamp, the other side is NaN. Duplicate
+        timestamps within a side keep the last price.
 
-        merged: List[Dict[str, Any]] = []
-        for t in all_times:
-            tick: Dict[str, Any] = {"t": t}
-            if t in up_by_t:
-                tick["up"] = up_by_t[t]
-            if t in down_by_t:
-                tick["down"] = down_by_t[t]
-            merged.append(tick)
+        The API returns price history sorted by time, so the common case is
+        a linear two-pointer merge; unsorted input falls back to a sort.
+        """
+        up_ts, up_px = cls._to_arrays(up_prices)
+        down_ts, down_px = cls._to_arrays(down_prices)
+
+        if cls._is_sorted(up_ts) and cls._is_sorted(down_ts):
+            return _merge_sorted(up_ts, up_px, down_ts, down_px)
+
+        # Typically only one side arrives out of order; sort just that one
+        up_ts, up_px = cls._sort_side(up_ts, up_px)
+        down_ts, down_px = cls._sort_side(down_ts, down_px)
+
+        ts = np.union1d(up_ts, down_ts)
+        return ts, cls._scatter(ts, up_ts, up_px), cls._scatter(ts, down_ts, down_px)
+
+    @staticmethod
+    def _to_arrays(prices: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert [{"t": ..., "p": ...}, ...] to timestamp and price arrays."""
+        n = len(prices)
+        ts = np.fromiter((p["t"] for p in prices), dtype=np.float64, count=n)
+        px = np.fromiter((p["p"] for p in prices), dtype=np.float64, count=n)
+        return ts, px
+
+    @staticmethod
+    def _is_sorted(values: np.ndarray) -> bool:
+        return bool(np.all(values[1:] >= values[:-1]))
+
+    @classmethod
+    def _sort_side(cls, side_ts: np.ndarray, side_px: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Stable-sort one side by timestamp unless it is already in order."""
+        if cls._is_sorted(side_ts):
+            return side_ts, side_px
+        order = np.argsort(side_ts, kind="stable")
+        return side_ts[order], side_px[order]
+
+    @staticmethod
+    def _scatter(ts: np.ndarray, side_ts: np.ndarray, side_px: np.ndarray) -> np.ndarray:
+        """Place one side's sorted prices onto the merged timeline, NaN where missing."""
+        out = np.full(len(ts), np.nan)
+        if len(side_ts) == 0:
+            return out
+
+        # side="right" - 1 lands on the last of any duplicate timestamps
+        idx = np.searchsorted(side_ts, ts, side="right") - 1
+        hit = (idx >= 0) & (side_ts[idx] == ts)
+        out[hit] = side_px[idx[hit]]
+        return out
+
+
+def warmup() -> None:
+    """
+    Compile the kernels (or load them from Numba's on-disk cache) once.
 
-        return merged
+    Runs a two-tick market through both the parallel and the serial
+    kernel paths, so JIT time is not charged to the first real run.
+    """
+    market = {
+        "slug": "warmup",
+        "start_ts": 0,
+        "end_ts": 900,
+        "up_prices": [{"t": 0, "p": 0.5}, {"t": 1, "p": 0.1}],
+        "down_prices": [{"t": 0, "p": 0.5}, {"t": 1, "p": 0.9}],
+    }
+    engine = BacktestEngine(BacktestConfig(), [market])
+    engine.run()
+    _run_packed(engine.config, engine._pack_markets(), engine.data_source, parallel=False)
@@ -18,24 +18,18 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 import os
-from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from backtest.data import (  # noqa: E402
-    fetch_market_history,
-    generate_synthetic_data,
-    save_data,
-    load_data,
-)
-from backtest.engine import BacktestConfig, BacktestEngine  # noqa: E402
+# backtest.data / backtest.engine pull in NumPy and Numba, so they are
+# imported inside main() once arguments are parsed; --help stays instant
 
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
     parser = argparse.ArgumentParser(
         description="Backtest the Polymarket Flash Crash Strategy"
     )
@@ -110,6 +104,19 @@ def main():
         help="Starting equity in USDC (default: 100.0)",
     )
 
+    # Execution
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for merging and simulating markets (default: 1)",
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Compile the backtest kernels on a dry run before the real run",
+    )
+
     # Output
     parser.add_argument(
         "--output",
@@ -121,10 +128,32 @@ def main():
         "--cache",
         type=str,
         default=None,
-        help="Cache data to/from this file (optional)",
+        help="Cache data to/from this file (optional); .npz unless a .json suffix is given",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Write trades and equity curve as column arrays (not read by the dashboard)",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the output JSON for reading (default: compact)",
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+# Built once at import; main() only parses
+_PARSER = _build_parser()
+
+
+def main(argv=None):
+    args = _PARSER.parse_args(argv)
+    if args.cache and not os.path.splitext(args.cache)[1]:
+        args.cache += ".npz"
+
+    from backtest.data import dump_json, save_data
 
     # ── Load or generate data ────────────────────────────────────────────
 
@@ -133,10 +162,15 @@ def main():
     print("=" * 60)
 
     if args.cache and os.path.exists(args.cache):
+        from backtest.data import iter_data
+
         print(f"\nLoading cached data from {args.cache} ...")
-        markets = load_data(args.cache)
+        # Streamed: markets are packed one at a time as the engine reads them
+        markets = iter_data(args.cache)
         data_source = "cached"
     elif args.source == "live":
+        from backtest.data import fetch_market_history
+
         print(f"\nFetching live data from Polymarket ({args.coin}, {args.markets} markets) ...")
         markets = fetch_market_history(
             coin=args.coin,
@@ -146,8 +180,10 @@ def main():
         if args.cache:
             save_data(markets, args.cache)
     else:
+        from backtest.data import load_synthetic_data
+
         print(f"\nGenerating synthetic data ({args.markets} markets, crash_prob={args.crash_prob}) ...")
-        markets = generate_synthetic_data(
+        markets = load_synthetic_data(
             num_markets=args.markets,
             crash_probability=args.crash_prob,
             seed=args.seed,
@@ -156,12 +192,10 @@ def main():
         if args.cache:
             save_data(markets, args.cache)
 
-    if not markets:
-        print("ERROR: No market data available. Exiting.")
-        sys.exit(1)
-
     # ── Configure and run engine ─────────────────────────────────────────
 
+    from backtest.engine import BacktestConfig, BacktestEngine, warmup
+
     config = BacktestConfig(
         drop_threshold=args.drop,
         lookback_seconds=args.lookback,
@@ -171,9 +205,17 @@ def main():
         starting_equity=args.equity,
     )
 
-    print(f"\nRunning backtest engine ({len(markets)} markets) ...")
+    if args.warmup:
+        print("\nWarming up backtest kernels ...")
+        warmup()
+
+    print("\nRunning backtest engine ...")
     engine = BacktestEngine(config, markets, data_source=data_source)
-    result = engine.run()
+    result = engine.run(workers=args.workers)
+
+    if not result.markets_analyzed:
+        print("ERROR: No market data available. Exiting.")
+        sys.exit(1)
 
     # ── Output ───────────────────────────────────────────────────────────
 
@@ -181,10 +223,11 @@ def main():
     print(result.summary())
 
     # Save JSON
-    output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(result.to_json(), f, indent=2)
+    dump_json(
+        result.to_columns() if args.columnar else result.to_json(),
+        args.output,
+        indent=args.pretty,
+    )
     print(f"\nResults saved to {args.output}")
 
 
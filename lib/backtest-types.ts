@@ -5,6 +5,7 @@ export interface BacktestConfig {
   stop_loss: number
   size: number
   max_positions: number
+  allow_reentry?: boolean
   starting_equity: number
 }
 
@@ -5,59 +5,68 @@ This script runs the backtest engine with synthetic data and saves
 the output to public/sample-result.json for the Next.js dashboard.
 """
 
-import json
+import argparse
 import sys
 import os
 
-# Determine project root from this script's location
-SCRIPT_DIR = os.path.dirname(os.path.abspath(sys.argv[0] if sys.argv[0] else "."))
+# Determine project root from this module's location
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)  # scripts/ -> project root
 if not os.path.exists(os.path.join(PROJECT_ROOT, "backtest")):
     # Fallback: try cwd
     PROJECT_ROOT = os.getcwd()
 sys.path.insert(0, PROJECT_ROOT)
 
-from backtest.data import generate_synthetic_data
-from backtest.engine import BacktestConfig, BacktestEngine
+from backtest.data import json_dumps, load_synthetic_data, write_payload  # noqa: E402
+from backtest.engine import BacktestConfig, BacktestEngine  # noqa: E402
 
 
-print("Generating synthetic market data...")
-markets = generate_synthetic_data(
-    num_markets=40,
-    crash_probability=0.35,
-    seed=42,
-)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the output JSON for reading (default: compact)",
+    )
+    args = parser.parse_args(argv)
 
-config = BacktestConfig(
-    drop_threshold=0.30,
-    lookback_seconds=10,
-    take_profit=0.10,
-    stop_loss=0.05,
-    size=5.0,
-    starting_equity=100.0,
-)
+    print("Generating synthetic market data...")
+    markets = load_synthetic_data(
+        num_markets=40,
+        crash_probability=0.35,
+        seed=42,
+    )
 
-print(f"Running backtest on {len(markets)} markets...")
-engine = BacktestEngine(config, markets, data_source="synthetic")
-result = engine.run()
+    config = BacktestConfig(
+        drop_threshold=0.30,
+        lookback_seconds=10,
+        take_profit=0.10,
+        stop_loss=0.05,
+        size=5.0,
+        starting_equity=100.0,
+    )
 
-print(result.summary())
+    print(f"Running backtest on {len(markets)} markets...")
+    engine = BacktestEngine(config, markets, data_source="synthetic")
+    result = engine.run()
 
-# Save to public/ for the dashboard
-output_path = os.path.join(PROJECT_ROOT, "public", "sample-result.json")
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    print(result.summary())
 
-with open(output_path, "w") as f:
-    json.dump(result.to_json(), f, indent=2)
+    # Serialize once; both files get the same bytes
+    payload = json_dumps(result.to_json(), indent=args.pretty)
 
-print(f"\nSaved to {output_path}")
+    # Save to public/ for the dashboard
+    output_path = os.path.join(PROJECT_ROOT, "public", "sample-result.json")
+    written = write_payload(payload, output_path)
 
-# Also save to backtest/results/
-results_dir = os.path.join(PROJECT_ROOT, "backtest", "results")
-os.makedirs(results_dir, exist_ok=True)
-results_path = os.path.join(results_dir, "latest.json")
+    print(f"\n{'Saved to' if written else 'Unchanged:'} {output_path}")
 
-with open(results_path, "w") as f:
-    json.dump(result.to_json(), f, indent=2)
+    # Also save to backtest/results/
+    results_path = os.path.join(PROJECT_ROOT, "backtest", "results", "latest.json")
+    written = write_payload(payload, results_path)
 
-print(f"Saved to {results_path}")
+    print(f"{'Saved to' if written else 'Unchanged:'} {results_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Unit Tests for Backtest Data Module
+
+Tests historical data fetching and synthetic data generation.
+
+Run with:
+    pytest tests/test_backtest_data.py -v
+"""
+
+import asyncio
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtest import data
+from backtest.data import (
+    _generate_single_market_prices,
+    dump_json,
+    fetch_market_history,
+    fetch_price_history,
+    generate_synthetic_data,
+    iter_data,
+    json_dumps,
+    load_data,
+    load_synthetic_data,
+    save_data,
+)
+
+
+# 2024-01-01 00:07:30 UTC -> current window starts at 00:00:00
+FIXED_NOW = datetime(2024, 1, 1, 0, 7, 30, tzinfo=timezone.utc)
+CURRENT_WINDOW = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+NEWEST_WINDOW = CURRENT_WINDOW - 900
+
+
+class _FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_NOW
+
+
+class TestFetchMarketHistory:
+    """Tests for the concurrent fetch_market_history implementation."""
+
+    def _patch_api(self, missing_windows=(), failing_tokens=()):
+        """Patch the async API helpers with in-memory fakes."""
+
+        # Keys of None bypass the disk cache but keep cache_lookup available
+        @data._disk_cached(lambda *args, **kwargs: None)
+        async def fake_get_market(session, slug):
+            window_ts = int(slug.rsplit("-", 1)[1])
+            if window_ts in missing_windows:
+                return None
+            return {
+                "clobTokenIds": f'["up-{window_ts}", "down-{window_ts}"]',
+                "outcomes": '["Up", "Down"]',
+            }
+
+        @data._disk_cached(lambda *args, **kwargs: None)
+        async def fake_price_history(session, token_id, start_ts, end_ts, fidelity=1):
+            if token_id in failing_tokens:
+                raise RuntimeError("boom")
+            return [{"t": start_ts, "p": 0.5}]
+
+        return (
+            patch.object(data, "_aget_market_by_slug", fake_get_market),
+            patch.object(data, "_afetch_price_history", fake_price_history),
+            patch.object(data, "datetime", _FixedDatetime),
+        )
+
+    def test_fetches_requested_number_of_markets(self):
+        """Test that the requested number of markets is returned, newest first."""
+        get_patch, history_patch, now_patch = self._patch_api()
+        with get_patch, history_patch, now_patch:
+            markets = fetch_market_history(coin="ETH", num_markets=3)
+
+        assert [m["start_ts"] for m in markets] == [
+            NEWEST_WINDOW, NEWEST_WINDOW - 900, NEWEST_WINDOW - 1800
+        ]
+        for m in markets:
+            assert m["slug"] == f"eth-updown-15m-{m['start_ts']}"
+            assert m["end_ts"] == m["start_ts"] + 900
+            assert m["up_token_id"] == f"up-{m['start_ts']}"
+            assert m["down_token_id"] == f"down-{m['start_ts']}"
+
+    def test_missing_markets_are_backfilled(self):
+        """Test that windows without a market are skipped and replaced by older ones."""
+        get_patch, history_patch, now_patch = self._patch_api(
+            missing_windows={NEWEST_WINDOW}
+        )
+        with get_patch, history_patch, now_patch:
+            markets = fetch_market_history(coin="BTC", num_markets=2)
+
+        assert [m["start_ts"] for m in markets] == [
+            NEWEST_WINDOW - 900, NEWEST_WINDOW - 1800
+        ]
+
+    def test_failed_history_does_not_sink_batch(self):
+        """Test that an exception for one token leaves the other markets intact."""
+        get_patch, history_patch, now_patch = self._patch_api(
+            failing_tokens={f"up-{NEWEST_WINDOW}", f"down-{NEWEST_WINDOW}"}
+        )
+        with get_patch, history_patch, now_patch:
+            markets = fetch_market_history(coin="SOL", num_markets=3)
+
+        assert [m["start_ts"] for m in markets] == [
+            NEWEST_WINDOW - 900, NEWEST_WINDOW - 1800, NEWEST_WINDOW - 2700
+        ]
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that the lookback stops after num_markets * 3 windows."""
+        get_patch, history_patch, now_patch = self._patch_api(
+            missing_windows={NEWEST_WINDOW - i * 900 for i in range(6)}
+        )
+        with get_patch, history_patch, now_patch:
+            markets = fetch_market_history(coin="XRP", num_markets=2)
+
+        assert markets == []
+
+    def test_unsupported_coin(self):
+        """Test that an unknown coin raises ValueError."""
+        with pytest.raises(ValueError):
+            fetch_market_history(coin="DOGE")
+
+
+class TestResponseCache:
+    """Tests for the on-disk cache of finalized market data."""
+
+    def _response(self):
+        resp = Mock()
+        resp.json.return_value = {"history": [{"t": 1700000000, "p": 0.5}]}
+        return resp
+
+    def test_finalized_history_is_cached(self, tmp_path):
+        """Test that a closed market's history is only fetched once."""
+        with patch.object(data, "CACHE_DIR", tmp_path), \
+                patch.object(data._SESSION, "get", return_value=self._response()) as get:
+            first = fetch_price_history("token", 1700000000, 1700000900)
+            second = fetch_price_history("token", 1700000000, 1700000900)
+
+        assert first == second == [{"t": 1700000000, "p": 0.5}]
+        assert get.call_count == 1
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+    def test_async_fetch_served_from_cache(self, tmp_path):
+        """Test that the async path reads entries written by the sync path."""
+        with patch.object(data, "CACHE_DIR", tmp_path), \
+                patch.object(data._SESSION, "get", return_value=self._response()):
+            fetch_price_history("token", 1700000000, 1700000900)
+
+            # No session: a network call would fail
+            cached = data._afetch_price_history.cache_lookup(
+                None, "token", 1700000000, 1700000900
+            )
+            fetched = asyncio.run(
+                data._afetch_price_history(None, "token", 1700000000, 1700000900)
+            )
+
+        assert cached == fetched == [{"t": 1700000000, "p": 0.5}]
+
+    def test_open_market_not_cached(self, tmp_path):
+        """Test that a market whose window has not closed is always refetched."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        with patch.object(data, "CACHE_DIR", tmp_path), \
+                patch.object(data._SESSION, "get", return_value=self._response()) as get:
+            fetch_price_history("token", now - 900, now)
+            fetch_price_history("token", now - 900, now)
+
+        assert get.call_count == 2
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_empty_result_not_cached(self, tmp_path):
+        """Test that failed or empty responses are not cached."""
+        with patch.object(data, "CACHE_DIR", tmp_path), \
+                patch.object(data._SESSION, "get", side_effect=RuntimeError("down")):
+            assert fetch_price_history("token", 1700000000, 1700000900) == []
+
+        assert list(tmp_path.glob("*.json")) == []
+
+
+class TestSyntheticData:
+    """Tests for synthetic market generation."""
+
+    def test_single_market_shape_and_bounds(self):
+        """Test one price per second per side, clamped to [0.02, 0.98]."""
+        prices = _generate_single_market_prices(start_ts=1000, seed=1)
+
+        for side in ("up_prices", "down_prices"):
+            points = prices[side]
+            assert [p["t"] for p in points] == list(range(1000, 1900))
+            assert all(0.02 <= p["p"] <= 0.98 for p in points)
+
+    def test_crash_is_injected(self):
+        """Test that an UP crash shows as a sharp drop at the crash tick."""
+        prices = _generate_single_market_prices(
+            start_ts=0, has_crash=True, crash_side="up",
+            crash_magnitude=0.4, crash_time_pct=0.5, seed=3,
+        )
+        up = [p["p"] for p in prices["up_prices"]]
+
+        assert up[449] - up[450] > 0.3
+
+    def test_crash_at_market_end_is_skipped(self):
+        """Test that crash_time_pct=1.0 injects no crash instead of failing."""
+        crashed = _generate_single_market_prices(
+            start_ts=0, has_crash=True, crash_time_pct=1.0, seed=3,
+        )
+        flat = _generate_single_market_prices(start_ts=0, seed=3)
+
+        assert crashed == flat
+
+    def test_synthetic_data_is_reproducible(self):
+        """Test that the same seed yields identical markets."""
+        first = generate_synthetic_data(num_markets=3, seed=5)
+        second = generate_synthetic_data(num_markets=3, seed=5)
+
+        # Timestamps are anchored to the current time, so compare prices only
+        for a, b in zip(first, second):
+            assert [p["p"] for p in a["up_prices"]] == [p["p"] for p in b["up_prices"]]
+            assert [p["p"] for p in a["down_prices"]] == [p["p"] for p in b["down_prices"]]
+            assert a["has_crash"] == b["has_crash"]
+
+
+    def test_synthetic_data_cached_by_args(self, tmp_path):
+        """Test that a repeated call loads the pickle instead of regenerating."""
+        with patch.object(data, "SYNTHETIC_CACHE_DIR", tmp_path), \
+                patch.object(data, "generate_synthetic_data",
+                             wraps=generate_synthetic_data) as generate:
+            first = load_synthetic_data(num_markets=2, seed=7)
+            second = load_synthetic_data(num_markets=2, seed=7)
+            load_synthetic_data(num_markets=2, seed=8)
+
+        assert first == second
+        assert generate.call_count == 2
+        assert len(list(tmp_path.glob("synth-*.pkl"))) == 2
+
+
+class TestJsonHelpers:
+    """Tests for JSON serialization and market data caching."""
+
+    def test_save_and_load_roundtrip(self, tmp_path):
+        """Test that saved market data loads back unchanged."""
+        markets = generate_synthetic_data(num_markets=2, seed=1)
+        path = tmp_path / "cache" / "markets.json"
+
+        save_data(markets, str(path))
+
+        assert load_data(str(path)) == markets
+
+    def test_npz_roundtrip(self, tmp_path):
+        """Test that the columnar .npz format loads back unchanged."""
+        markets = generate_synthetic_data(num_markets=3, seed=4)
+        markets.append({"slug": "empty", "start_ts": 0, "end_ts": 900,
+                        "up_prices": [], "down_prices": []})
+        path = tmp_path / "markets.npz"
+
+        save_data(markets, str(path))
+
+        assert load_data(str(path)) == markets
+        assert list(iter_data(str(path))) == markets
+        assert path.stat().st_size < len(json_dumps(markets)) / 5
+
+    def test_iter_data_streams_saved_markets(self, tmp_path):
+        """Test that streaming a saved file yields the same markets in order."""
+        markets = generate_synthetic_data(num_markets=3, seed=2)
+        path = tmp_path / "markets.json"
+        save_data(markets, str(path))
+
+        streamed = iter_data(str(path))
+
+        assert not isinstance(streamed, list)
+        assert list(streamed) == markets
+
+    def test_dump_json_creates_parent_dirs(self, tmp_path):
+        """Test that dump_json writes compact JSON into a new directory."""
+        path = tmp_path / "results" / "latest.json"
+
+        dump_json({"equity": np.array([100.0, 101.5])}, str(path))
+
+        assert path.read_bytes() == b'{"equity":[100.0,101.5]}'
+
+    def test_dump_json_indent(self, tmp_path):
+        """Test that indent=True writes human-readable JSON."""
+        path = tmp_path / "latest.json"
+
+        dump_json({"equity": [100.0]}, str(path), indent=True)
+
+        assert data.json_loads(path.read_bytes()) == {"equity": [100.0]}
+        assert b"\n" in path.read_bytes()
+
+    def test_write_payload_replaces_atomically(self, tmp_path):
+        """Test that an existing file is replaced and no temp file is left behind."""
+        path = tmp_path / "latest.json"
+        path.write_bytes(b"old")
+
+        data.write_payload(b"new", str(path))
+
+        assert path.read_bytes() == b"new"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["latest.json", "latest.json.sha"]
+        assert path.stat().st_mode & 0o777 == 0o666 & ~data._UMASK
+
+    def test_write_payload_concurrent_writers(self, tmp_path):
+        """Test that concurrent writers each publish a complete file."""
+        path = tmp_path / "latest.json"
+        payloads = [bytes([65 + i]) * 100_000 for i in range(6)]
+
+        def write(payload):
+            for _ in range(10):
+                data.write_payload(payload, str(path))
+
+        threads = [threading.Thread(target=write, args=(p,)) for p in payloads]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert path.read_bytes() in payloads
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_write_payload_removes_temp_on_failure(self, tmp_path):
+        """Test that a failed rename leaves neither a temp file nor a target."""
+        path = tmp_path / "latest.json"
+
+        with patch.object(data.os, "replace", side_effect=OSError("full")):
+            with pytest.raises(OSError):
+                data.write_payload(b"{}", str(path))
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_write_payload_skips_unchanged_content(self, tmp_path):
+        """Test that identical bytes are not rewritten, with or without the sidecar."""
+        path = tmp_path / "latest.json"
+
+        assert data.write_payload(b"{}", str(path)) is True
+        mtime = path.stat().st_mtime_ns
+        assert data.write_payload(b"{}", str(path)) is False
+
+        path.with_suffix(".json.sha").unlink()
+        assert data.write_payload(b"{}", str(path)) is False
+        assert path.stat().st_mtime_ns == mtime
+
+        assert data.write_payload(b"[]", str(path)) is True
+        assert path.read_bytes() == b"[]"
+
+    def test_write_payload_ignores_stale_sidecar(self, tmp_path):
+        """Test that a sidecar no longer matching the file does not skip a write."""
+        path = tmp_path / "latest.json"
+        data.write_payload(b'{"a":1}', str(path))
+
+        # Same size, different content, sidecar left as it was
+        path.write_bytes(b'{"a":2}')
+
+        assert data.write_payload(b'{"a":1}', str(path)) is True
+        assert path.read_bytes() == b'{"a":1}'
+
+    def test_write_payload_recreates_removed_dir(self, tmp_path):
+        """Test that a cached output directory removed mid-process is recreated."""
+        out_dir = tmp_path / "results"
+        data.write_payload(b"{}", str(out_dir / "a.json"))
+        for child in out_dir.iterdir():
+            child.unlink()
+        out_dir.rmdir()
+
+        data.write_payload(b"{}", str(out_dir / "b.json"))
+
+        assert (out_dir / "b.json").read_bytes() == b"{}"
+
+    def test_dumps_numpy_values(self):
+        """Test that NumPy arrays and scalars serialize as plain JSON."""
+        payload = {"a": np.array([1.5, 2.0]), "b": np.float64(0.25), "c": np.int64(3)}
+
+        assert data.json_loads(json_dumps(payload)) == {"a": [1.5, 2.0], "b": 0.25, "c": 3}
+
+    def test_stdlib_fallback(self):
+        """Test the stdlib json path used when orjson is not installed."""
+        with patch.object(data, "orjson", None):
+            encoded = json_dumps({"a": np.array([1, 2])}, indent=True)
+            assert data.json_loads(encoded) == {"a": [1, 2]}
+            assert json_dumps({"a": np.array([1, 2])}) == b'{"a":[1,2]}'
@@ -0,0 +1,461 @@
+"""
+Unit Tests for Backtest Engine
+
+Tests flash crash detection, exits, and result statistics.
+
+Run with:
+    pytest tests/test_backtest_engine.py -v
+"""
+
+import subprocess
+import sys
+import textwrap
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtest import engine as engine_module
+from backtest._kernels import FastTracker
+from backtest.data import generate_synthetic_data, json_dumps, json_loads, save_data
+from backtest.engine import BacktestConfig, BacktestEngine, BacktestResult, Trade, warmup
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _market(up, down=None, start_ts=1000, slug="test-market"):
+    """Build a one-second-fidelity market from price lists."""
+    if down is None:
+        down = [round(1.0 - p, 4) for p in up]
+    return {
+        "slug": slug,
+        "start_ts": start_ts,
+        "end_ts": start_ts + 900,
+        "up_prices": [{"t": start_ts + i, "p": p} for i, p in enumerate(up)],
+        "down_prices": [{"t": start_ts + i, "p": p} for i, p in enumerate(down)],
+    }
+
+
+# UP crashes from 0.50 to 0.15 at t=1005
+CRASH = [0.50] * 5 + [0.15]
+
+
+class TestBacktestEngine:
+    """Tests for BacktestEngine.run."""
+
+    def test_no_crash_no_trades(self):
+        """Test that a flat market produces no trades."""
+        result = BacktestEngine(BacktestConfig(), [_market([0.5] * 50)]).run()
+
+        assert result.total_trades == 0
+        assert result.total_pnl == 0
+
+    def test_take_profit(self):
+        """Test entry on a flash crash and exit at the take profit level."""
+        market = _market(CRASH + [0.20, 0.30, 0.40])
+        result = BacktestEngine(BacktestConfig(), [market]).run()
+
+        assert result.total_trades == 1
+        trade = result.trades[0]
+        assert trade.side == "up"
+        assert trade.entry_price == 0.15
+        assert trade.entry_time == 1005
+        assert trade.exit_type == "take_profit"
+        assert trade.exit_price == pytest.approx(0.25)
+        assert trade.exit_time == 1007
+        assert trade.pnl == pytest.approx(0.10 * 5.0 / 0.15)
+
+    def test_stop_loss(self):
+        """Test exit at the stop loss level."""
+        market = _market(CRASH + [0.15] * 10 + [0.08])
+        result = BacktestEngine(BacktestConfig(), [market]).run()
+
+        assert result.total_trades == 1
+        trade = result.trades[0]
+        assert trade.exit_type == "stop_loss"
+        assert trade.exit_price == pytest.approx(0.10)
+        assert trade.pnl == pytest.approx(-0.05 * 5.0 / 0.15)
+
+    def test_market_end_close(self):
+        """Test that an open position is closed at the last price at market end."""
+        market = _market(CRASH + [0.17, 0.18])
+        result = BacktestEngine(BacktestConfig(), [market]).run()
+
+        assert result.total_trades == 1
+        trade = result.trades[0]
+        assert trade.exit_type == "market_end"
+        assert trade.exit_price == 0.18
+        assert trade.exit_time == market["end_ts"]
+
+    def test_reentry_after_exit(self):
+        """Test that a second crash re-enters unless re-entry is disabled."""
+        up = CRASH + [0.30] + [0.50] * 15 + [0.15, 0.30]
+        market = _market(up, down=[0.50] * len(up))
+
+        assert BacktestEngine(BacktestConfig(), [market]).run().total_trades == 2
+        no_reentry = BacktestEngine(BacktestConfig(allow_reentry=False), [market]).run()
+        assert no_reentry.total_trades == 1
+        assert no_reentry.trades[0].exit_time == 1006
+
+    def test_crash_outside_lookback_ignored(self):
+        """Test that a slow decline longer than the lookback window is not a crash."""
+        up = [round(0.50 - 0.01 * i, 2) for i in range(36)]
+        result = BacktestEngine(BacktestConfig(lookback_seconds=10), [_market(up)]).run()
+
+        assert result.total_trades == 0
+
+    def test_down_side_crash(self):
+        """Test that a crash on the DOWN side opens a DOWN position."""
+        down = CRASH + [0.30]
+        up = [0.50] * len(down)
+        result = BacktestEngine(BacktestConfig(), [_market(up, down)]).run()
+
+        assert result.total_trades == 1
+        assert result.trades[0].side == "down"
+        assert result.trades[0].exit_type == "take_profit"
+
+    def test_missing_ticks(self):
+        """Test markets where the two sides have different timestamps."""
+        market = _market(CRASH + [0.30])
+        market["down_prices"] = market["down_prices"][::2]
+        result = BacktestEngine(BacktestConfig(), [market]).run()
+
+        assert result.total_trades == 1
+        assert result.trades[0].exit_type == "take_profit"
+
+    def test_empty_market_skipped(self):
+        """Test that markets without prices are skipped."""
+        empty = {"slug": "empty", "start_ts": 0, "end_ts": 900,
+                 "up_prices": [], "down_prices": []}
+        result = BacktestEngine(BacktestConfig(), [empty]).run()
+
+        assert result.total_trades == 0
+        assert result.equity_curve == []
+        assert result.markets_analyzed == 1
+
+    def test_accepts_market_iterator(self):
+        """Test that markets can be a one-shot iterator, e.g. from iter_data."""
+        markets = [
+            _market(CRASH + [0.30], slug="m1"),
+            _market([0.5] * 20, start_ts=2000, slug="m2"),
+        ]
+        streamed = BacktestEngine(BacktestConfig(), iter(markets)).run()
+
+        assert streamed.markets_analyzed == 2
+        assert streamed.to_json() == BacktestEngine(BacktestConfig(), markets).run().to_json()
+
+    def test_equity_curve(self):
+        """Test equity sampling every 10 ticks plus one point per market boundary."""
+        first = _market(CRASH + [0.30] + [0.5] * 18, start_ts=1000, slug="m1")
+        second = _market([0.5] * 15, start_ts=2000, slug="m2")
+        result = BacktestEngine(BacktestConfig(), [first, second]).run()
+
+        pnl = result.trades[0].pnl
+        assert result.equity_curve == [
+            {"time": 1000, "equity": 100.0},
+            {"time": 1009, "equity": pytest.approx(100.0 + pnl)},
+            {"time": 1019, "equity": pytest.approx(100.0 + pnl)},
+            {"time": 1900, "equity": pytest.approx(100.0 + pnl)},
+            {"time": 2004, "equity": pytest.approx(100.0 + pnl)},
+            {"time": 2014, "equity": pytest.approx(100.0 + pnl)},
+            {"time": 2900, "equity": pytest.approx(100.0 + pnl)},
+        ]
+
+
+class TestRunGrid:
+    """Tests for parallel parameter sweeps."""
+
+    @pytest.mark.parametrize("backend", ["loky", "threading"])
+    def test_grid_matches_sequential_runs(self, backend):
+        """Test that each grid result equals a sequential run of its config."""
+        markets = [
+            _market(CRASH + [0.20, 0.30], slug="m1"),
+            _market(CRASH + [0.15] * 10 + [0.08], start_ts=2000, slug="m2"),
+        ]
+        configs = [
+            BacktestConfig(take_profit=0.05),
+            BacktestConfig(take_profit=0.10),
+            BacktestConfig(drop_threshold=0.5),
+        ]
+
+        engine = BacktestEngine(BacktestConfig(), markets)
+        results = engine.run_grid(configs, n_jobs=2, backend=backend)
+
+        assert [r.config for r in results] == configs
+        for config, result in zip(configs, results):
+            expected = BacktestEngine(config, markets).run()
+            assert result.to_json() == expected.to_json()
+
+    def test_shared_block_unlinked(self, monkeypatch):
+        """Test that the shared market block is removed once the grid finishes."""
+        names = []
+        run_shared = engine_module._run_shared
+
+        def recording_run_shared(config, shared, data_source):
+            names.append(shared.name)
+            return run_shared(config, shared, data_source)
+
+        # n_jobs=1 runs in this process, so the patched entry point is used
+        monkeypatch.setattr(engine_module, "_run_shared", recording_run_shared)
+        markets = [_market(CRASH + [0.20, 0.30])]
+        engine = BacktestEngine(BacktestConfig(), markets)
+
+        (result,) = engine.run_grid([BacktestConfig()], n_jobs=1)
+
+        assert result.to_json() == BacktestEngine(BacktestConfig(), markets).run().to_json()
+        assert len(names) == 1
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=names[0])
+
+
+class TestProcessPool:
+    """Tests for running markets in worker processes."""
+
+    def test_workers_match_single_process(self, monkeypatch):
+        """Test that a pooled run aggregates markets in their original order."""
+        # One market per task and one task in flight per worker, so the
+        # bounded submission window is exercised with only three markets
+        monkeypatch.setattr(engine_module, "POOL_BATCH_SIZE", 1)
+        monkeypatch.setattr(engine_module, "POOL_TASKS_PER_WORKER", 1)
+        markets = [
+            _market(CRASH + [0.30] + [0.5] * 20, slug="m1"),
+            _market([0.5] * 25, start_ts=2000, slug="m2"),
+            _market(CRASH + [0.15] * 10 + [0.08], start_ts=3000, slug="m3"),
+        ]
+
+        pooled = BacktestEngine(BacktestConfig(), iter(markets)).run(workers=2)
+        expected = BacktestEngine(BacktestConfig(), markets).run()
+
+        assert pooled.to_json() == expected.to_json()
+
+    def test_pool_after_parallel_kernel_exits(self):
+        """Test that a pooled run after a threaded run lets the interpreter exit."""
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {str(PROJECT_ROOT)!r})
+            from backtest.engine import BacktestConfig, BacktestEngine
+            market = {{
+                "slug": "m", "start_ts": 0, "end_ts": 900,
+                "up_prices": [{{"t": t, "p": 0.5}} for t in range(20)],
+                "down_prices": [{{"t": t, "p": 0.5}} for t in range(20)],
+            }}
+            BacktestEngine(BacktestConfig(), [market]).run()
+            BacktestEngine(BacktestConfig(), [market]).run(workers=2)
+            print("done")
+        """)
+
+        proc = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, timeout=120
+        )
+
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout.strip() == "done"
+
+
+class TestKernelBuild:
+    """Tests for kernel warmup and the pure-Python fallback."""
+
+    def test_warmup(self):
+        """Test that warmup runs both kernel paths without error."""
+        warmup()
+
+    def test_fallback_without_numba_matches(self, tmp_path):
+        """Test that the kernels give identical results when Numba is missing."""
+        path = tmp_path / "markets.json"
+        markets = generate_synthetic_data(num_markets=4, crash_probability=1.0, seed=3)
+        save_data(markets, str(path))
+        script = textwrap.dedent(f"""
+            import sys
+            sys.modules["numba"] = None  # make `import numba` raise ImportError
+            sys.path.insert(0, {str(PROJECT_ROOT)!r})
+            from backtest import _kernels
+            from backtest.data import json_dumps, load_data
+            from backtest.engine import BacktestConfig, BacktestEngine
+            assert not _kernels.NUMBA_AVAILABLE
+            result = BacktestEngine(BacktestConfig(), load_data({str(path)!r})).run()
+            sys.stdout.buffer.write(json_dumps(result.to_json()["trades"]))
+        """)
+
+        proc = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, timeout=120
+        )
+
+        assert proc.returncode == 0, proc.stderr.decode()
+        expected = BacktestEngine(BacktestConfig(), markets).run().to_json()["trades"]
+        assert expected
+        assert json_loads(proc.stdout) == expected
+
+
+class TestFastTracker:
+    """Tests for the compiled price tracker."""
+
+    def test_detects_crash_within_lookback(self):
+        """Test a drop at least drop_threshold within the window is detected."""
+        tracker = FastTracker(10.0, 0.30, 100)
+        tracker.record(0, 0.50, 100.0)
+        tracker.record(0, 0.15, 105.0)
+
+        assert tracker.detect_flash_crash(105.0) == (0, 0.15)
+
+    def test_ignores_points_outside_lookback(self):
+        """Test that prices older than the lookback window are not compared."""
+        tracker = FastTracker(10.0, 0.30, 100)
+        tracker.record(1, 0.50, 100.0)
+        tracker.record(1, 0.40, 108.0)
+        tracker.record(1, 0.15, 115.0)
+
+        assert tracker.detect_flash_crash(115.0)[0] == -1
+
+    def test_ignores_missing_prices(self):
+        """Test that NaN and non-positive prices are not recorded."""
+        tracker = FastTracker(10.0, 0.30, 100)
+        tracker.record(0, 0.50, 100.0)
+        tracker.record(0, float("nan"), 101.0)
+        tracker.record(0, 0.0, 102.0)
+
+        assert tracker.count[0] == 1
+        assert tracker.detect_flash_crash(102.0)[0] == -1
+
+
+class TestMergeTicks:
+    """Tests for merging UP/DOWN price lists into parallel arrays."""
+
+    def test_merge_fills_missing_with_nan(self):
+        """Test that timestamps present on only one side get NaN on the other."""
+        engine = BacktestEngine(BacktestConfig(), [])
+        ts, up, down = engine._merge_ticks_soa(
+            [{"t": 1, "p": 0.4}, {"t": 3, "p": 0.5}],
+            [{"t": 2, "p": 0.6}, {"t": 3, "p": 0.5}],
+        )
+
+        np.testing.assert_array_equal(ts, [1, 2, 3])
+        np.testing.assert_array_equal(up, [0.4, np.nan, 0.5])
+        np.testing.assert_array_equal(down, [np.nan, 0.6, 0.5])
+
+    def test_merge_sorted_duplicates_keep_last(self):
+        """Test that repeated timestamps in sorted input collapse to the last price."""
+        engine = BacktestEngine(BacktestConfig(), [])
+        ts, up, down = engine._merge_ticks_soa(
+            [{"t": 1, "p": 0.4}, {"t": 1, "p": 0.45}, {"t": 2, "p": 0.5}],
+            [{"t": 2, "p": 0.6}, {"t": 2, "p": 0.55}],
+        )
+
+        np.testing.assert_array_equal(ts, [1, 2])
+        np.testing.assert_array_equal(up, [0.45, 0.5])
+        np.testing.assert_array_equal(down, [np.nan, 0.55])
+
+    def test_merge_unsorted_and_duplicates(self):
+        """Test that unsorted input is ordered and duplicates keep the last price."""
+        engine = BacktestEngine(BacktestConfig(), [])
+        ts, up, down = engine._merge_ticks_soa(
+            [{"t": 3, "p": 0.5}, {"t": 1, "p": 0.4}, {"t": 3, "p": 0.7}],
+            [],
+        )
+
+        np.testing.assert_array_equal(ts, [1, 3])
+        np.testing.assert_array_equal(up, [0.4, 0.7])
+        assert np.isnan(down).all()
+
+
+def _trade(pnl, exit_type="take_profit"):
+    return Trade(
+        market_slug="m", side="up", entry_price=0.2, exit_price=0.3,
+        entry_time=0, exit_time=1, size_usdc=5.0, size_shares=25.0,
+        pnl=pnl, exit_type=exit_type,
+    )
+
+
+def _result(pnls, equity=()):
+    return BacktestResult(
+        config=BacktestConfig(),
+        trades=[_trade(p) for p in pnls],
+        equity_times=np.arange(len(equity), dtype=np.float64),
+        equity_values=np.array(equity, dtype=np.float64),
+        data_source="synthetic",
+        markets_analyzed=1,
+    )
+
+
+class TestBacktestResult:
+    """Tests for BacktestResult statistics."""
+
+    def test_trade_statistics(self):
+        """Test win/loss counts, averages, profit factor and Sharpe ratio."""
+        result = _result([2.0, -1.0, 4.0, 0.0])
+
+        assert result.total_pnl == pytest.approx(5.0)
+        assert result.winning_trades == 2
+        assert result.losing_trades == 2
+        assert result.win_rate == 50.0
+        assert result.avg_win == pytest.approx(3.0)
+        assert result.avg_loss == pytest.approx(-0.5)
+        assert result.profit_factor == pytest.approx(6.0)
+        assert result.sharpe_ratio == pytest.approx(1.25 / np.std([2, -1, 4, 0], ddof=1))
+
+    def test_no_losses_profit_factor(self):
+        """Test that profit factor is infinite with no losing trades."""
+        assert _result([1.0]).profit_factor == float("inf")
+        assert _result([]).profit_factor == 0.0
+
+    def test_empty_result(self):
+        """Test statistics of a run without trades."""
+        result = _result([])
+
+        assert result.total_pnl == 0.0
+        assert result.avg_win == 0.0
+        assert result.avg_loss == 0.0
+        assert result.sharpe_ratio == 0.0
+        assert result.max_drawdown == 0.0
+        assert result.max_drawdown_dollars == 0.0
+
+    def test_trade_to_dict_rounds_without_touching_fields(self):
+        """Test that serialized trades are rounded while stats keep full precision."""
+        trade = _trade(1 / 3)
+        serialized = trade.to_dict()
+        serialized["pnl"] = 0.0
+
+        assert trade.to_dict()["pnl"] == 0.3333
+        assert trade.pnl == 1 / 3
+
+    def test_to_json_built_once(self):
+        """Test that repeated to_json calls reuse the cached row layout."""
+        result = BacktestEngine(BacktestConfig(), [_market(CRASH + [0.30])]).run()
+
+        first = result.to_json()
+        first["extra"] = True
+
+        second = result.to_json()
+        assert "extra" not in second
+        assert second["trades"] is first["trades"]
+
+    def test_columns_match_rows(self):
+        """Test that the columnar layout carries the same trades and equity."""
+        market = _market(CRASH + [0.30] + [0.5] * 20)
+        result = BacktestEngine(BacktestConfig(), [market]).run()
+        rows = result.to_json()
+        columns = json_loads(json_dumps(result.to_columns()))
+        # profit_factor is inf here, which JSON writes as null
+        summary = {k: v for k, v in rows["summary"].items() if k != "profit_factor"}
+        del columns["summary"]["profit_factor"]
+
+        assert columns["summary"] == summary
+        for name in ("market_slug", "side", "exit_type"):
+            assert columns["trades"][name] == [t[name] for t in rows["trades"]]
+        assert columns["trades"]["pnl"] == pytest.approx(
+            [t["pnl"] for t in rows["trades"]], abs=1e-4
+        )
+        assert columns["equity_curve"]["equity"] == pytest.approx(
+            [p["equity"] for p in rows["equity_curve"]], abs=1e-4
+        )
+
+    def test_max_drawdown(self):
+        """Test drawdown measured from the running equity peak."""
+        result = _result([], equity=[100.0, 120.0, 90.0, 110.0, 80.0, 130.0])
+
+        assert result.max_drawdown_dollars == pytest.approx(40.0)
+        assert result.max_drawdown == pytest.approx(40.0 / 120.0 * 100)